@@ -0,0 +1,138 @@
+"""
+Benchmark suite command line.
+
+Usage
+-----
+python -m geo_augment.benchmarks run --sizes 256 1024 --out current.json
+python -m geo_augment.benchmarks run --stages "floods.*" --baseline base.json
+python -m geo_augment.benchmarks compare base.json current.json
+"""
+
+import argparse
+import json
+import sys
+
+from geo_augment.benchmarks.dems import SIZES
+from geo_augment.benchmarks.suite import STAGES, compare, run_suite
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _print_row(row: dict):
+    print(
+        f"{row['stage']:<26} {row['size']:>6}  "
+        f"{row['time_s']:9.4f}s  {row['peak_bytes'] / 2**20:9.1f} MiB"
+    )
+
+
+def _report(regressions: list[dict]) -> int:
+    if not regressions:
+        print("No regressions.")
+        return 0
+
+    print(f"{len(regressions)} regression(s):")
+    for r in regressions:
+        print(
+            f"  {r['stage']:<26} {r['size']:>6}  {r['metric']:<10} "
+            f"{r['baseline']:.4g} -> {r['current']:.4g} "
+            f"({(r['ratio'] - 1) * 100:+.0f}%)"
+        )
+    return 1
+
+
+def _add_tolerances(parser):
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown (default: 0.25)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.10,
+        help="Allowed relative peak-memory growth (default: 0.10)",
+    )
+
+
+def _tolerances(args) -> dict:
+    return {
+        "time_tolerance": args.time_tolerance,
+        "memory_tolerance": args.memory_tolerance,
+    }
+
+
+def cmd_run(args) -> int:
+    results = run_suite(
+        sizes=args.sizes,
+        stages=args.stages,
+        repeats=args.repeats,
+        seed=args.seed,
+        progress=_print_row,
+    )
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+
+    if args.baseline:
+        return _report(compare(_load(args.baseline), results, **_tolerances(args)))
+
+    return 0
+
+
+def cmd_compare(args) -> int:
+    return _report(
+        compare(_load(args.baseline), _load(args.current), **_tolerances(args))
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m geo_augment.benchmarks",
+        description="GeoAugment pipeline benchmarks",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="Run the benchmark suite")
+    run.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[256, 1024],
+        help=f"DEM sides to benchmark (standard sizes: {list(SIZES)})",
+    )
+    run.add_argument(
+        "--stages",
+        nargs="+",
+        help="Glob patterns over stage names: "
+        + ", ".join(s.name for s in STAGES),
+    )
+    run.add_argument("--repeats", type=int, default=3)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--out", help="Write results JSON here")
+    run.add_argument("--baseline", help="Compare against this results JSON")
+    _add_tolerances(run)
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="Compare two results files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    _add_tolerances(cmp)
+    cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return 0
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Compare the float32 and float64 precision policies.
+
+Reports, for the flood pipeline (feature stack and synthesis) and the
+roads and urban synthesis:
+- the largest absolute difference of float32 results from float64 ones
+  (checked against tolerances), and
+- peak resident memory of each policy, measured in a fresh process,
+  for a plain DEM and for a masked one as ``RasterLoader.read()``
+  returns it.
+
+Usage
+-----
+python -m geo_augment.benchmarks.precision --size 4000 --samples 4
+"""
+
+import argparse
+import dataclasses
+import multiprocessing
+import resource
+import sys
+
+import numpy as np
+
+from geo_augment.benchmarks.dems import synthetic_dem
+from geo_augment.core.precision import SUPPORTED_DTYPES
+from geo_augment.domains.floods.api import synthesize_flood_risk
+from geo_augment.domains.floods.features import stack_flood_features
+from geo_augment.domains.floods.spec import (
+    DEFAULT_FLOOD_SPEC,
+    DEFAULT_FLOOD_CONSTRAINTS,
+    DEFAULT_LATENT_SPEC,
+)
+from geo_augment.domains.roads.api import synthesize_road_connectivity
+from geo_augment.domains.roads.spec import (
+    DEFAULT_ROAD_SPEC,
+    DEFAULT_ROAD_CONSTRAINTS,
+    DEFAULT_LATENT_ROAD_SPEC,
+)
+from geo_augment.domains.urban.api import synthesize_urban_morphology
+from geo_augment.domains.urban.spec import (
+    DEFAULT_URBAN_SPEC,
+    DEFAULT_URBAN_CONSTRAINTS,
+    DEFAULT_LATENT_URBAN_SPEC,
+)
+
+
+# Largest accepted |float32 - float64| for values in [0, 1].
+FEATURE_TOLERANCE = 1e-4
+RISK_TOLERANCE = 1e-4
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _pipeline(dem, n_samples, dtype, seed):
+    features = stack_flood_features(dem, dtype=dtype)
+    risk = synthesize_flood_risk(
+        dem,
+        dataclasses.replace(DEFAULT_FLOOD_SPEC, random_seed=seed),
+        DEFAULT_FLOOD_CONSTRAINTS,
+        DEFAULT_LATENT_SPEC,
+        n_samples=n_samples,
+        dtype=dtype,
+    )
+    return features, risk
+
+
+def _road_pipeline(dem, n_samples, dtype, seed):
+    return synthesize_road_connectivity(
+        dem,
+        dataclasses.replace(DEFAULT_ROAD_SPEC, random_seed=seed),
+        DEFAULT_ROAD_CONSTRAINTS,
+        DEFAULT_LATENT_ROAD_SPEC,
+        n_samples=n_samples,
+        dtype=dtype,
+    )
+
+
+def _urban_pipeline(dem, n_samples, dtype, seed):
+    return synthesize_urban_morphology(
+        dem,
+        dataclasses.replace(DEFAULT_URBAN_SPEC, random_seed=seed),
+        DEFAULT_URBAN_CONSTRAINTS,
+        DEFAULT_LATENT_URBAN_SPEC,
+        n_samples=n_samples,
+        dtype=dtype,
+    )
+
+
+PIPELINES = {
+    "floods": _pipeline,
+    "roads": _road_pipeline,
+    "urban": _urban_pipeline,
+}
+
+
+def _memory_worker(size, n_samples, dtype, seed, masked, pipeline, queue):
+    dem = synthetic_dem(size, seed).astype(np.float32)
+    if masked:
+        dem = np.ma.masked_array(dem)
+    baseline = _peak_rss_bytes()
+    PIPELINES[pipeline](dem, n_samples, dtype, seed)
+    queue.put(_peak_rss_bytes() - baseline)
+
+
+def peak_memory(
+    size: int,
+    n_samples: int,
+    dtype: str,
+    seed: int = 0,
+    masked: bool = False,
+    pipeline: str = "floods",
+) -> int:
+    """
+    Peak RSS growth (bytes) of a pipeline in a fresh process.
+
+    ``pipeline`` is a key of ``PIPELINES``. With ``masked`` the DEM is
+    passed as a masked array.
+
+    The baseline is taken after imports and DEM creation, so only the
+    pipeline's own allocations are counted.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(
+        target=_memory_worker,
+        args=(size, n_samples, dtype, seed, masked, pipeline, queue),
+    )
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def accuracy(size: int, n_samples: int, seed: int = 0) -> dict:
+    """
+    Largest deviations of the float32 pipeline from the float64 one.
+
+    Raises AssertionError when elevation, slope, flood risk, road
+    connectivity or urban density exceed their tolerance. Flow
+    accumulation is reported as the fraction of cells that differ: rounding elevations to float32 can create ties that
+    reroute D8 flow, so it has no meaningful absolute bound.
+    """
+    dem = synthetic_dem(size, seed).astype(np.float32)
+
+    f32, r32 = _pipeline(dem, n_samples, "float32", seed)
+    f64, r64 = _pipeline(dem, n_samples, "float64", seed)
+
+    assert f32.dtype == np.float32 and r32.dtype == np.float32
+    assert f64.dtype == np.float64 and r64.dtype == np.float64
+
+    # A masked DEM (as read from a raster) must not change the results
+    # or promote them to float64.
+    fm, rm = _pipeline(np.ma.masked_array(dem), n_samples, "float32", seed)
+    assert fm.dtype == np.float32 and rm.dtype == np.float32
+    if not (np.array_equal(fm, f32) and np.array_equal(rm, r32)):
+        raise AssertionError("masked DEM input changes float32 results")
+
+    stats = {
+        "elevation_max_abs": float(np.abs(f32[0] - f64[0]).max()),
+        "slope_max_abs": float(np.abs(f32[1] - f64[1]).max()),
+        "flow_acc_changed_frac": float(
+            (np.abs(f32[2] - f64[2]) > FEATURE_TOLERANCE).mean()
+        ),
+        "risk_max_abs": float(np.abs(r32 - r64).max()),
+    }
+
+    for name in ("roads", "urban"):
+        out32 = PIPELINES[name](dem, n_samples, "float32", seed)
+        out64 = PIPELINES[name](dem, n_samples, "float64", seed)
+        assert out32.dtype == np.float32 and out64.dtype == np.float64
+        stats[f"{name}_max_abs"] = float(np.abs(out32 - out64).max())
+
+    for key in ("elevation_max_abs", "slope_max_abs"):
+        if stats[key] > FEATURE_TOLERANCE:
+            raise AssertionError(f"float32 {key}={stats[key]:.2e} too large")
+
+    for key in ("risk_max_abs", "roads_max_abs", "urban_max_abs"):
+        if stats[key] > RISK_TOLERANCE:
+            raise AssertionError(f"float32 {key}={stats[key]:.2e} too large")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare float32 and float64 precision policies",
+    )
+    parser.add_argument("--size", type=int, default=4000)
+    parser.add_argument("--samples", type=int, default=4)
+    parser.add_argument(
+        "--accuracy-size",
+        type=int,
+        default=512,
+        help="Raster side used for the float32 vs float64 comparison",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats = accuracy(args.accuracy_size, args.samples, args.seed)
+    for key, value in stats.items():
+        print(f"{key:>22}: {value:.3e}")
+
+    for pipeline in PIPELINES:
+        peaks = {
+            dtype: peak_memory(
+                args.size, args.samples, dtype, args.seed, pipeline=pipeline
+            )
+            for dtype in SUPPORTED_DTYPES
+        }
+        print(f"{pipeline}:")
+        for dtype, peak in peaks.items():
+            print(f"{dtype:>8} peak RSS {peak / 2**20:10.1f} MiB")
+        print(f"   ratio {peaks['float32'] / peaks['float64']:.2f}")
+
+    masked_peak = peak_memory(
+        args.size, args.samples, "float32", args.seed, masked=True
+    )
+    print(f"float32 peak RSS {masked_peak / 2**20:10.1f} MiB (masked DEM)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Raster handle leak check.
+
+Reads many windows from a tiled GeoTIFF with ``RasterLoader.read_windows``
+on several threads, over and over, and fails when the number of open
+dataset handles grows with the number of calls instead of staying within
+one per pool thread plus the calling thread.
+
+Usage
+-----
+python -m geo_augment.benchmarks.raster_handles [--calls 50 --workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import warnings
+
+import numpy as np
+
+from geo_augment.benchmarks.dems import synthetic_dem
+from geo_augment.io.raster import RasterLoader
+
+
+WINDOW = 64
+
+
+def _write_dem(path: str, size: int, seed: int):
+    import rasterio
+
+    dem = synthetic_dem(size, seed).astype(np.float32)
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        height=size,
+        width=size,
+        count=1,
+        dtype="float32",
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+    ) as dst:
+        dst.write(dem, 1)
+
+
+def check(
+    calls: int = 50,
+    workers: int = 4,
+    size: int = 1024,
+    seed: int = 0,
+) -> dict:
+    """
+    Run ``calls`` parallel ``read_windows`` calls; raise AssertionError
+    when the open handle count exceeds ``workers + 1``.
+    """
+    windows = [
+        (row, col, WINDOW)
+        for row in range(0, size - WINDOW, WINDOW * 3)
+        for col in range(0, size - WINDOW, WINDOW * 3)
+    ]
+
+    from rasterio.errors import NotGeoreferencedWarning
+
+    with tempfile.TemporaryDirectory() as tmp, warnings.catch_warnings():
+        # The test raster needs no georeferencing.
+        warnings.simplefilter("ignore", NotGeoreferencedWarning)
+        path = os.path.join(tmp, "dem.tif")
+        _write_dem(path, size, seed)
+
+        # No tile cache: every call decodes, so every call uses the pool.
+        loader = RasterLoader(path, cache_bytes=0)
+        loader.read_windows(windows)
+
+        peak = 0
+        for _ in range(calls):
+            loader.read_windows(windows, workers=workers)
+            peak = max(peak, len(loader._handles))
+
+        loader.close()
+        after_close = len(loader._handles)
+
+    if peak > workers + 1 or after_close:
+        raise AssertionError(
+            f"{peak} handles open across {calls} calls "
+            f"(limit {workers + 1}), {after_close} left after close()"
+        )
+
+    return {"calls": calls, "workers": workers, "peak_handles": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that parallel raster reads keep handles bounded",
+    )
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--size", type=int, default=1024)
+    args = parser.parse_args()
+
+    result = check(args.calls, args.workers, args.size)
+    print(
+        f"{result['peak_handles']} handle(s) open at most over "
+        f"{result['calls']} calls with {result['workers']} workers: OK"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+CLI startup budget check.
+
+Runs ``geoaugment --help`` and ``floods generate --dry-run`` in fresh
+interpreters under ``python -X importtime`` and fails when either one
+exceeds the import-time budget or imports a heavy dependency that should
+only load on the code paths that use it.
+
+Usage
+-----
+python -m geo_augment.benchmarks.startup [--budget 0.5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+
+# Total cumulative import time allowed per command, in seconds.
+STARTUP_BUDGET_S = 0.5
+
+HEAVY_MODULES = ("rasterio", "scipy.ndimage", "matplotlib", "torch", "sklearn")
+
+_DRY_RUN_CONFIG = """\
+synthesis:
+  perturbation_strength: 0.15
+  spatial_scale: 30
+"""
+
+
+def import_profile(args: list[str]) -> tuple[float, set[str]]:
+    """
+    Run ``python -X importtime -m geo_augment.cli.main *args``.
+
+    Returns
+    -------
+    total_s : float
+        Summed cumulative time of the top-level imports.
+    modules : set of str
+        Every module imported.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "geo_augment.cli.main", *args],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"geoaugment {' '.join(args)} failed:\n{proc.stderr[-2000:]}"
+        )
+
+    total = 0.0
+    modules = set()
+
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+
+        # Nested imports are indented; top-level ones have one space.
+        if not name.startswith("  "):
+            total += int(cumulative) / 1e6
+        modules.add(name.strip())
+
+    return total, modules
+
+
+def check(budget: float = STARTUP_BUDGET_S) -> list[dict]:
+    """
+    Profile ``--help`` and ``--dry-run``; raise AssertionError on a breach.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "flood.yaml")
+        with open(config, "w") as f:
+            f.write(_DRY_RUN_CONFIG)
+
+        commands = {
+            "--help": ["--help"],
+            "--dry-run": [
+                "floods", "generate",
+                "--dem", os.path.join(tmp, "unused.tif"),
+                "--out", tmp,
+                "--config", config,
+                "--dry-run",
+            ],
+        }
+
+        results = []
+        for label, args in commands.items():
+            total, modules = import_profile(args)
+            results.append({
+                "command": label,
+                "import_s": total,
+                "heavy": [m for m in HEAVY_MODULES if m in modules],
+            })
+
+    failures = [
+        f"{r['command']}: imports {', '.join(r['heavy'])}"
+        for r in results if r["heavy"]
+    ] + [
+        f"{r['command']}: {r['import_s']:.3f}s of imports > {budget:.3f}s"
+        for r in results if r["import_s"] > budget
+    ]
+    if failures:
+        raise AssertionError("Startup budget exceeded:\n" + "\n".join(failures))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CLI startup cost")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_S)
+    args = parser.parse_args()
+
+    for row in check(args.budget):
+        print(f"{row['command']:<10} imports {row['import_s']:.3f}s")
+    print(f"OK (budget {args.budget:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Stage benchmarks for the flood, roads and urban pipelines.
+
+Each stage is timed on a synthetic DEM (best of ``repeats`` wall-clock
+runs) and then run once more under ``tracemalloc`` to record its peak
+traced allocation, which covers NumPy buffers. Results are plain JSON,
+so a run can be stored as a baseline and compared with a later one.
+"""
+
+import fnmatch
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, replace
+from typing import Callable
+
+import numpy as np
+import scipy
+
+from geo_augment import __version__
+from geo_augment.benchmarks.dems import fractal_dem
+from geo_augment.datasets.export import export_npz
+from geo_augment.datasets.tiling import tile_raster
+from geo_augment.domains.floods.api import synthesize_flood_risk
+from geo_augment.domains.floods.features import stack_flood_features
+from geo_augment.domains.floods.flow_accumulation import compute_flow_accumulation
+from geo_augment.domains.floods.flow_direction import compute_flow_direction
+from geo_augment.domains.floods.sweep import grid_space, sweep_flood_specs
+from geo_augment.domains.floods.spec import (
+    DEFAULT_FLOOD_SPEC,
+    DEFAULT_FLOOD_CONSTRAINTS,
+    DEFAULT_LATENT_SPEC,
+)
+from geo_augment.domains.floods.threshold import apply_threshold
+from geo_augment.evaluation.ensemble import evaluate_ensemble
+from geo_augment.evaluation.spectral import spatial_structure
+from geo_augment.domains.roads.api import synthesize_road_connectivity
+from geo_augment.domains.roads.features import stack_road_features
+from geo_augment.domains.roads.spec import (
+    DEFAULT_ROAD_SPEC,
+    DEFAULT_ROAD_CONSTRAINTS,
+    DEFAULT_LATENT_ROAD_SPEC,
+)
+from geo_augment.domains.urban.api import synthesize_urban_morphology
+from geo_augment.domains.urban.features import stack_urban_features
+from geo_augment.domains.urban.spec import (
+    DEFAULT_URBAN_SPEC,
+    DEFAULT_URBAN_CONSTRAINTS,
+    DEFAULT_LATENT_URBAN_SPEC,
+)
+
+
+SCHEMA_VERSION = 1
+
+N_SAMPLES = 4
+TILE_SIZE = 128
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One benchmarked pipeline stage.
+
+    ``prepare(dem, seed)`` builds the stage inputs outside the timed
+    region; ``run(*inputs)`` is what gets timed.
+    """
+
+    name: str
+    prepare: Callable
+    run: Callable
+
+
+def _dem_only(dem, seed):
+    return (dem,)
+
+
+def _flow_dir_inputs(dem, seed):
+    return (compute_flow_direction(dem),)
+
+
+def _flood_synthesis_inputs(dem, seed):
+    return (
+        dem,
+        replace(DEFAULT_FLOOD_SPEC, random_seed=seed),
+        DEFAULT_FLOOD_CONSTRAINTS,
+        DEFAULT_LATENT_SPEC,
+        N_SAMPLES,
+    )
+
+
+def _sweep_inputs(dem, seed):
+    points = grid_space({
+        "perturbation_strength": [0.05, 0.15, 0.3],
+        "risk_percentile": [85.0, 90.0, 95.0],
+    })
+    return (
+        dem,
+        points,
+        replace(DEFAULT_FLOOD_SPEC, random_seed=seed),
+        DEFAULT_FLOOD_CONSTRAINTS,
+        DEFAULT_LATENT_SPEC,
+        N_SAMPLES,
+    )
+
+
+def _tiling_inputs(dem, seed):
+    features = stack_flood_features(dem)
+    return features, apply_threshold(features[3], 0.6)
+
+
+def _export_inputs(dem, seed):
+    return tile_raster(*_tiling_inputs(dem, seed), tile_size=TILE_SIZE)
+
+
+def _run_tiling(features, labels):
+    return tile_raster(features, labels, tile_size=TILE_SIZE)
+
+
+def _run_export(X, y):
+    with tempfile.TemporaryDirectory() as out_dir:
+        export_npz(X, y, out_dir=out_dir)
+
+
+def _evaluation_inputs(dem, seed):
+    return (synthesize_flood_risk(*_flood_synthesis_inputs(dem, seed)),)
+
+
+def _road_inputs(dem, seed):
+    return (
+        dem,
+        replace(DEFAULT_ROAD_SPEC, random_seed=seed),
+        DEFAULT_ROAD_CONSTRAINTS,
+        DEFAULT_LATENT_ROAD_SPEC,
+        N_SAMPLES,
+    )
+
+
+def _urban_inputs(dem, seed):
+    return (
+        dem,
+        replace(DEFAULT_URBAN_SPEC, random_seed=seed),
+        DEFAULT_URBAN_CONSTRAINTS,
+        DEFAULT_LATENT_URBAN_SPEC,
+        N_SAMPLES,
+    )
+
+
+STAGES = (
+    Stage("floods.flow_direction", _dem_only, compute_flow_direction),
+    Stage("floods.flow_accumulation", _flow_dir_inputs, compute_flow_accumulation),
+    Stage("floods.features", _dem_only, stack_flood_features),
+    Stage("floods.synthesis", _flood_synthesis_inputs, synthesize_flood_risk),
+    Stage("floods.sweep", _sweep_inputs, sweep_flood_specs),
+    Stage("floods.tiling", _tiling_inputs, _run_tiling),
+    Stage("floods.export_npz", _export_inputs, _run_export),
+    Stage("evaluation.ensemble", _evaluation_inputs, evaluate_ensemble),
+    Stage("evaluation.spectral", _evaluation_inputs, spatial_structure),
+    Stage("roads.features", _dem_only, stack_road_features),
+    Stage("roads.synthesis", _road_inputs, synthesize_road_connectivity),
+    Stage("urban.features", _dem_only, stack_urban_features),
+    Stage("urban.synthesis", _urban_inputs, synthesize_urban_morphology),
+)
+
+
+def select_stages(patterns=None) -> list[Stage]:
+    """
+    Stages whose name matches any glob pattern (all stages if None).
+    """
+    if not patterns:
+        return list(STAGES)
+
+    selected = [
+        stage for stage in STAGES
+        if any(fnmatch.fnmatch(stage.name, p) for p in patterns)
+    ]
+    if not selected:
+        raise ValueError(f"No benchmark stage matches {patterns}")
+    return selected
+
+
+def _measure(stage: Stage, inputs: tuple, repeats: int) -> dict:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stage.run(*inputs)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        stage.run(*inputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time_s": min(times), "peak_bytes": int(peak)}
+
+
+def environment() -> dict:
+    return {
+        "geoaugment": __version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(
+    sizes=(256, 1024),
+    stages=None,
+    repeats: int = 3,
+    seed: int = 0,
+    progress: Callable | None = None,
+) -> dict:
+    """
+    Benchmark the selected stages on square fractal DEMs.
+
+    Parameters
+    ----------
+    sizes : iterable of int
+        Raster sides, usually taken from ``dems.SIZES``.
+    stages : optional list of str
+        Glob patterns over stage names (e.g. ``"floods.*"``).
+    progress : optional callable
+        Called with each result row as it completes.
+
+    Returns
+    -------
+    dict
+        ``{"schema", "environment", "config", "results"}``, JSON-ready.
+    """
+    if repeats <= 0:
+        raise ValueError("repeats must be >= 1")
+
+    selected = select_stages(stages)
+    results = []
+
+    for size in sizes:
+        dem = fractal_dem(size, seed)
+
+        for stage in selected:
+            inputs = stage.prepare(dem, seed)
+            row = {
+                "stage": stage.name,
+                "size": int(size),
+                **_measure(stage, inputs, repeats),
+            }
+            del inputs
+
+            results.append(row)
+            if progress is not None:
+                progress(row)
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "environment": environment(),
+        "config": {
+            "sizes": [int(s) for s in sizes],
+            "stages": [s.name for s in selected],
+            "repeats": repeats,
+            "seed": seed,
+            "n_samples": N_SAMPLES,
+            "tile_size": TILE_SIZE,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.10,
+    min_time: float = 0.01,
+) -> list[dict]:
+    """
+    Stage/size pairs of ``current`` that regressed against ``baseline``.
+
+    A regression is a time or peak-memory increase beyond the relative
+    tolerance. Timings where both runs are under ``min_time`` seconds are
+    too noisy to judge and are skipped. Pairs present in only one run are
+    ignored.
+
+    Returns
+    -------
+    list of dict
+        ``{"stage", "size", "metric", "baseline", "current", "ratio"}``
+    """
+    base = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+
+    for row in current["results"]:
+        ref = base.get((row["stage"], row["size"]))
+        if ref is None:
+            continue
+
+        for metric, tolerance in (
+            ("time_s", time_tolerance),
+            ("peak_bytes", memory_tolerance),
+        ):
+            old, new = ref[metric], row[metric]
+
+            if metric == "time_s" and max(old, new) < min_time:
+                continue
+
+            ratio = new / old if old else float("inf")
+            if ratio > 1.0 + tolerance:
+                regressions.append({
+                    "stage": row["stage"],
+                    "size": row["size"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "ratio": ratio,
+                })
+
+    return regressions
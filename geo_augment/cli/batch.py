@@ -0,0 +1,428 @@
+"""
+``geoaugment floods batch``: many DEMs x many samples in one process pool.
+
+Every (DEM, sample) pair is a job. Jobs are grouped into tasks of up to
+``--batch-size`` samples of one DEM, so a worker reads each DEM once per
+task (and keeps the last one cached), and tasks are spread over a
+process pool.
+
+Output layout (``--out``):
+    manifest.json      run settings and DEM list, written once
+    completed.jsonl    one line per finished job, appended and fsynced
+    <dem>/sample_NNNNN exported dataset of one sample
+
+A job's output is written to ``<name>.partial`` and renamed into place
+once complete, then recorded in ``completed.jsonl``. Re-running the same
+command skips recorded jobs, so an interrupted run resumes where it
+stopped. Sample ``i`` of a DEM is identical to sample ``i`` of
+``synthesize_flood_risk`` on that DEM with the same specs.
+"""
+
+import glob
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+
+import numpy as np
+
+from geo_augment.cli.main import export_flood_dataset, load_flood_specs
+from geo_augment.core.parallel import spawn_sample_seeds
+from geo_augment.core.precision import set_default_dtype
+from geo_augment.domains.floods.api import (
+    synthesize_flood_batch,
+    synthesize_flood_labels,
+)
+from geo_augment.domains.floods.constraints import compute_downhill_bias
+from geo_augment.domains.floods.validation import validate_all_flood_specs
+from geo_augment.io.raster import RasterLoader
+
+
+MANIFEST = "manifest.json"
+COMPLETED = "completed.jsonl"
+MANIFEST_VERSION = 1
+
+
+# -----------------------------
+# DEM discovery
+# -----------------------------
+
+def _read_listing(path: str) -> list[str]:
+    """
+    DEM paths from a listing file: a JSON list, or one path per line
+    (``#`` starts a comment). Relative paths are relative to the file.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+
+    with open(path) as f:
+        text = f.read()
+
+    if path.endswith(".json"):
+        entries = json.loads(text)
+    else:
+        entries = [
+            line.split("#", 1)[0].strip() for line in text.splitlines()
+        ]
+
+    return [os.path.join(base, e) for e in entries if e]
+
+
+def resolve_dem_paths(patterns=None, listing=None) -> list[str]:
+    """
+    Absolute DEM paths from glob patterns and/or a listing file, in a
+    stable order without duplicates.
+    """
+    paths = []
+
+    for pattern in patterns or []:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise FileNotFoundError(f"No DEM matches '{pattern}'")
+        paths.extend(matches)
+
+    if listing:
+        paths.extend(_read_listing(listing))
+
+    if not paths:
+        raise ValueError("No DEMs given (use --dems and/or --dem-list)")
+
+    return list(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+def dem_keys(paths: list[str]) -> list[str]:
+    """
+    Output directory name of each DEM (its file stem).
+    """
+    keys = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+
+    duplicates = sorted({k for k in keys if keys.count(k) > 1})
+    if duplicates:
+        raise ValueError(
+            f"DEM file names must be unique; duplicated: {duplicates}"
+        )
+
+    return keys
+
+
+def job_id(key: str, sample: int) -> str:
+    return f"{key}/sample_{sample:05d}"
+
+
+# -----------------------------
+# Manifest
+# -----------------------------
+
+def _json_roundtrip(obj):
+    return json.loads(json.dumps(obj))
+
+
+def load_completed(out_dir: str) -> dict[str, dict]:
+    """
+    Finished jobs recorded in ``completed.jsonl``, keyed by job id.
+
+    A torn last line (from a crash mid-write) is ignored.
+    """
+    path = os.path.join(out_dir, COMPLETED)
+    completed = {}
+
+    if not os.path.exists(path):
+        return completed
+
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            completed[entry["job"]] = entry
+
+    return completed
+
+
+def _append_completed(path: str, entries: list[dict]):
+    with open(path, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _prepare_manifest(out_dir: str, settings: dict, dems: list[str]) -> dict:
+    """
+    Write the manifest of a new run, or check it matches an existing one.
+
+    Returns the settings to use, which carry the seed entropy of the
+    original run when resuming.
+    """
+    path = os.path.join(out_dir, MANIFEST)
+
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+
+        previous = dict(manifest["settings"])
+        if settings["seed_entropy"] is None:
+            settings = dict(settings, seed_entropy=previous["seed_entropy"])
+
+        if previous != _json_roundtrip(settings) or manifest["dems"] != dems:
+            raise ValueError(
+                f"{path} was written with different settings or DEMs; "
+                "use a new --out directory to start a different run"
+            )
+        return settings
+
+    if settings["seed_entropy"] is None:
+        settings = dict(
+            settings, seed_entropy=int(np.random.SeedSequence().entropy)
+        )
+
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(
+            {
+                "version": MANIFEST_VERSION,
+                "settings": _json_roundtrip(settings),
+                "dems": dems,
+            },
+            f,
+            indent=2,
+        )
+    os.replace(tmp, path)
+
+    return settings
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+
+_WORKER = {}
+
+
+def _init_worker(specs: tuple, settings: dict, out_dir: str):
+    synthesis_spec, constraints, latent_spec, dtype = specs
+    set_default_dtype(dtype)
+
+    _WORKER.clear()
+    _WORKER.update(
+        specs=(synthesis_spec, constraints, latent_spec),
+        dtype=dtype,
+        settings=settings,
+        out_dir=out_dir,
+        seeds=spawn_sample_seeds(
+            settings["seed_entropy"], settings["n_samples"]
+        ),
+    )
+
+
+def _load_dem(path: str):
+    if _WORKER.get("dem_path") != path:
+        _, constraints, _ = _WORKER["specs"]
+        loader = RasterLoader(path)
+        dem = loader.read()
+        georef = (
+            loader.metadata()
+            if _WORKER["settings"]["format"] == "cog"
+            else None
+        )
+        bias = (
+            compute_downhill_bias(dem, dtype=_WORKER["dtype"])
+            if constraints.enforce_monotonic_downhill
+            else None
+        )
+        _WORKER.update(
+            dem_path=path, dem=dem, downhill_bias=bias, georef=georef
+        )
+
+    return _WORKER["dem"], _WORKER["downhill_bias"]
+
+
+def _run_task(dem_path: str, key: str, samples: list[int]) -> list[dict]:
+    start = time.perf_counter()
+    settings = _WORKER["settings"]
+    synthesis_spec, constraints, latent_spec = _WORKER["specs"]
+
+    dem, downhill_bias = _load_dem(dem_path)
+    risk = synthesize_flood_batch(
+        dem,
+        [_WORKER["seeds"][i] for i in samples],
+        synthesis_spec,
+        constraints,
+        latent_spec,
+        downhill_bias,
+        _WORKER["dtype"],
+    )
+
+    entries = []
+    for sample, surface in zip(samples, risk):
+        threshold = settings["threshold"]
+        labels = (
+            None
+            if threshold is None
+            else synthesize_flood_labels(risk=surface, threshold=threshold)
+        )
+
+        name = job_id(key, sample)
+        final = os.path.join(_WORKER["out_dir"], name)
+        partial = final + ".partial"
+        shutil.rmtree(partial, ignore_errors=True)
+
+        export_flood_dataset(
+            surface,
+            labels,
+            out_dir=partial,
+            fmt=settings["format"],
+            tile_size=settings["tile_size"],
+            overlap=settings["overlap"],
+            metadata={
+                "dem": dem_path,
+                "sample": sample,
+                "tile_size": settings["tile_size"],
+                "overlap": settings["overlap"],
+                "threshold": threshold,
+            },
+            georef=_WORKER["georef"],
+        )
+
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(partial, final)
+        entries.append({"job": name, "dem": dem_path, "sample": sample})
+
+    elapsed = time.perf_counter() - start
+    for entry in entries:
+        entry["seconds"] = elapsed / len(entries)
+
+    return entries
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+def plan_tasks(dems, keys, n_samples, completed, batch_size):
+    """
+    Pending (dem_path, key, samples) tasks, DEM by DEM.
+    """
+    tasks = []
+
+    for path, key in zip(dems, keys):
+        pending = [
+            i for i in range(n_samples) if job_id(key, i) not in completed
+        ]
+        for start in range(0, len(pending), batch_size):
+            tasks.append((path, key, pending[start:start + batch_size]))
+
+    return tasks
+
+
+def run_batch(args) -> int:
+    if args.samples <= 0:
+        raise ValueError("--samples must be >= 1")
+    if args.batch_size <= 0:
+        raise ValueError("--batch-size must be >= 1")
+    # Checked by the tiler too, but only once every worker has synthesized.
+    if not 0 <= args.overlap < args.tile_size:
+        raise ValueError("--overlap must be in [0, --tile-size)")
+
+    synthesis_spec, constraints, latent_spec, dtype = load_flood_specs(
+        args.config, args.dtype
+    )
+    validate_all_flood_specs(
+        synthesis=synthesis_spec,
+        constraints=constraints,
+        latent=latent_spec,
+    )
+
+    dems = resolve_dem_paths(args.dems, args.dem_list)
+    keys = dem_keys(dems)
+
+    os.makedirs(args.out, exist_ok=True)
+
+    settings = _prepare_manifest(
+        args.out,
+        {
+            "synthesis": asdict(synthesis_spec),
+            "constraints": asdict(constraints),
+            "latent": asdict(latent_spec),
+            "dtype": dtype.name,
+            "n_samples": args.samples,
+            "format": args.format,
+            "tile_size": args.tile_size,
+            "overlap": args.overlap,
+            "threshold": args.threshold,
+            "seed_entropy": synthesis_spec.random_seed,
+        },
+        dems,
+    )
+
+    completed = load_completed(args.out)
+    tasks = plan_tasks(dems, keys, args.samples, completed, args.batch_size)
+    n_jobs = len(dems) * args.samples
+    n_pending = sum(len(samples) for _, _, samples in tasks)
+
+    print(
+        f"{len(dems)} DEM(s) x {args.samples} sample(s) = {n_jobs} jobs; "
+        f"{n_jobs - n_pending} already done, {n_pending} pending."
+    )
+
+    if args.dry_run or not tasks:
+        return 0
+
+    workers = args.workers or os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    init_args = (
+        (synthesis_spec, constraints, latent_spec, dtype),
+        settings,
+        args.out,
+    )
+    log_path = os.path.join(args.out, COMPLETED)
+    done = n_jobs - n_pending
+    failures = []
+    start = time.perf_counter()
+
+    def record(task, entries):
+        nonlocal done
+        _append_completed(log_path, entries)
+        done += len(entries)
+        print(f"[{done}/{n_jobs}] {task[1]}: samples {task[2][0]}-{task[2][-1]}")
+
+    if workers == 1:
+        _init_worker(*init_args)
+        for task in tasks:
+            try:
+                record(task, _run_task(*task))
+            except Exception as e:
+                failures.append((task, e))
+                print(f"FAILED {task[1]} samples {task[2]}: {e}")
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=init_args,
+        ) as pool:
+            futures = {pool.submit(_run_task, *task): task for task in tasks}
+            try:
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        record(task, future.result())
+                    except Exception as e:
+                        failures.append((task, e))
+                        print(f"FAILED {task[1]} samples {task[2]}: {e}")
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Finished {n_pending - sum(len(t[2]) for t, _ in failures)} jobs "
+        f"in {elapsed:.1f}s with {workers} worker(s)."
+    )
+
+    if failures:
+        print(f"{len(failures)} task(s) failed; re-run to retry them.")
+        return 1
+
+    return 0
@@ -1,64 +1,202 @@
 import argparse
 import os
+import sys
+import tempfile
 
-from geo_augment.io.raster import RasterLoader
-from geo_augment.domains.floods.api import (
-    synthesize_flood_risk,
-    synthesize_flood_labels,
-)
-from geo_augment.datasets.tiling import tile_raster
-from geo_augment.datasets.export import export_npz, export_torch
-
-from geo_augment.config import (
-    load_yaml_config,
-    build_flood_specs_from_config,
-    summarize_specs,
-)
-from geo_augment.domains.floods.spec import (
-    DEFAULT_FLOOD_SPEC,
-    DEFAULT_FLOOD_CONSTRAINTS,
-    DEFAULT_LATENT_SPEC,
-)
+from geo_augment.core.precision import SUPPORTED_DTYPES
 
 
-def floods_generate(args):
-    # -----------------------------
-    # 1. Load DEM
-    # -----------------------------
-    print("Loading DEM...")
-    dem = RasterLoader(args.dem).read()
+# Heavy dependencies (rasterio, scipy, torch) are imported inside the
+# commands that need them, so `--help` and `--dry-run` start quickly.
 
-    # -----------------------------
-    # 2. Load synthesis specs
-    # -----------------------------
-    if args.config:
-        cfg = load_yaml_config(args.config)
+
+EXPORT_FORMATS = ["npz", "npz-chunked", "memmap", "torch", "cog"]
+
+
+def load_flood_specs(config_path=None, dtype=None):
+    """
+    Flood specs from a YAML config (or the defaults) and the run dtype.
+
+    ``dtype`` (from ``--dtype``) overrides the config's top-level
+    ``dtype``; None means the float32 default.
+
+    Returns
+    -------
+    synthesis_spec, constraints, latent_spec, dtype
+    """
+    from geo_augment.config import (
+        load_yaml_config,
+        build_flood_specs_from_config,
+        build_dtype_from_config,
+    )
+    from geo_augment.core.precision import resolve_dtype
+    from geo_augment.domains.floods.spec import (
+        DEFAULT_FLOOD_SPEC,
+        DEFAULT_FLOOD_CONSTRAINTS,
+        DEFAULT_LATENT_SPEC,
+    )
+
+    config_dtype = None
+    if config_path:
+        cfg = load_yaml_config(config_path)
         synthesis_spec, constraints, latent_spec = (
             build_flood_specs_from_config(cfg)
         )
+        config_dtype = build_dtype_from_config(cfg)
     else:
         synthesis_spec = DEFAULT_FLOOD_SPEC
         constraints = DEFAULT_FLOOD_CONSTRAINTS
         latent_spec = DEFAULT_LATENT_SPEC
 
+    dtype = resolve_dtype(dtype if dtype is not None else config_dtype)
+    return synthesis_spec, constraints, latent_spec, dtype
+
+
+def export_flood_dataset(
+    risk,
+    labels,
+    out_dir: str,
+    fmt: str,
+    tile_size: int,
+    overlap: int,
+    metadata: dict,
+    name: str = "geoaugment_flood",
+    georef: dict | None = None,
+):
+    """
+    Tile one risk surface (and optional labels) and export it as ``fmt``.
+
+    ``cog`` writes the full rasters untiled, georeferenced with the
+    ``transform`` and ``crs`` of ``georef`` (the source DEM profile).
+    """
+    from geo_augment.datasets.tiling import (
+        tile_raster_to_store,
+        open_tile_store,
+    )
+    from geo_augment.datasets.export import (
+        export_cog,
+        export_npz,
+        export_npz_chunked,
+        export_torch,
+    )
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError("Unsupported export format")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    if fmt == "cog":
+        export_cog(
+            risk,
+            labels,
+            out_dir=out_dir,
+            name=name,
+            georef=georef,
+            metadata=metadata,
+        )
+        return
+
+    if fmt == "memmap":
+        tile_raster_to_store(
+            risk[None],
+            labels,
+            out_dir=out_dir,
+            name=name,
+            tile_size=tile_size,
+            overlap=overlap,
+            metadata=metadata,
+        )
+        return
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as scratch:
+        store = tile_raster_to_store(
+            risk[None],
+            labels,
+            out_dir=scratch,
+            tile_size=tile_size,
+            overlap=overlap,
+        )
+        X, y, _ = open_tile_store(store)
+
+        if fmt == "npz":
+            export_npz(X, y, out_dir=out_dir, name=name, metadata=metadata)
+        elif fmt == "npz-chunked":
+            export_npz_chunked(
+                X, y, out_dir=out_dir, name=name, metadata=metadata
+            )
+        else:
+            export_torch(X, y, out_dir=out_dir, name=name)
+
+        del X, y
+
+
+def _georef_for(loader, shape):
+    georef = loader.metadata()
+    if tuple(shape) != loader.shape:
+        from geo_augment.pyramid import level_georef
+
+        georef = level_georef(georef, shape)
+    return georef
+
+
+def floods_generate(args):
+    from geo_augment.config import summarize_specs
+    from geo_augment.core.precision import set_default_dtype
+
+    # -----------------------------
+    # 1. Load synthesis specs
+    # -----------------------------
+    synthesis_spec, constraints, latent_spec, dtype = load_flood_specs(
+        args.config, args.dtype
+    )
+    set_default_dtype(dtype)
+
     print("\nFlood synthesis configuration:")
-    summarize_specs(synthesis_spec, constraints, latent_spec)
+    print(summarize_specs(synthesis_spec, constraints, latent_spec))
 
     if args.dry_run:
         print("\nDry-run complete. No data generated.")
         return
 
+    from geo_augment.io.raster import RasterLoader
+    from geo_augment.domains.floods.api import (
+        synthesize_flood_risk,
+        synthesize_flood_labels,
+    )
+
     # -----------------------------
-    # 3. Generate continuous risk
+    # 2-3. Load DEM, generate continuous risk
     # -----------------------------
-    print("\nGenerating continuous flood risk...")
-    risk_maps = synthesize_flood_risk(
-        dem=dem,
-        synthesis_spec=synthesis_spec,
-        constraints=constraints,
-        latent_spec=latent_spec,
-        n_samples=1,
-    )
+    loader = RasterLoader(args.dem)
+
+    if args.level:
+        from geo_augment.pyramid import synthesize_pyramid
+
+        print(
+            f"\nGenerating flood risk at pyramid level {args.level} "
+            f"({args.level_mode})..."
+        )
+        risk_maps = synthesize_pyramid(
+            "floods",
+            loader,
+            synthesis_spec,
+            constraints,
+            latent_spec,
+            level=args.level,
+            mode=args.level_mode,
+        )
+    else:
+        print("\nLoading DEM...")
+        dem = loader.read()
+
+        print("\nGenerating continuous flood risk...")
+        risk_maps = synthesize_flood_risk(
+            dem=dem,
+            synthesis_spec=synthesis_spec,
+            constraints=constraints,
+            latent_spec=latent_spec,
+            n_samples=1,
+        )
 
     risk = risk_maps[0]
 
@@ -75,45 +213,59 @@ def floods_generate(args):
         labels = None
 
     # -----------------------------
-    # 5. Tiling
+    # 5. Tiling + export
     # -----------------------------
-    print("Tiling dataset...")
-    X, y = tile_raster(
+    print(f"Tiling and exporting dataset ({args.format})...")
+    export_flood_dataset(
         risk,
-        labels, # type: ignore
+        labels,
+        out_dir=args.out,
+        fmt=args.format,
         tile_size=args.tile_size,
         overlap=args.overlap,
+        metadata={
+            "tile_size": args.tile_size,
+            "overlap": args.overlap,
+            "threshold": args.threshold,
+            "level": args.level,
+        },
+        georef=_georef_for(loader, risk.shape) if args.format == "cog" else None,
     )
 
-    # -----------------------------
-    # 6. Export
-    # -----------------------------
+    print("Done.")
+
+
+def floods_generate_cmd(args):
+    if not args.profile:
+        floods_generate(args)
+        return
+
+    from geo_augment.core.profiling import profile
+
+    with profile() as prof:
+        floods_generate(args)
+
     os.makedirs(args.out, exist_ok=True)
+    report = prof.write_json(os.path.join(args.out, "profile.json"))
+    trace = prof.write_chrome_trace(
+        os.path.join(args.out, "profile.trace.json")
+    )
 
-    print(f"Exporting dataset ({args.format})...")
-    if args.format == "npz":
-        export_npz(
-            X,
-            y,
-            out_dir=args.out,
-            name="geoaugment_flood",
-            metadata={
-                "tile_size": args.tile_size,
-                "overlap": args.overlap,
-                "threshold": args.threshold,
-            },
-        )
-    elif args.format == "torch":
-        export_torch(
-            X,
-            y,
-            out_dir=args.out,
-            name="geoaugment_flood",
-        )
-    else:
-        raise ValueError("Unsupported export format")
+    print("\nStage profile:")
+    print(prof.summary())
+    print(f"Profile written to {report} (Chrome trace: {trace})")
 
-    print("Done.")
+
+def floods_batch_cmd(args):
+    from geo_augment.cli.batch import run_batch
+
+    sys.exit(run_batch(args))
+
+
+def floods_sweep_cmd(args):
+    from geo_augment.cli.sweep import run_sweep
+
+    sys.exit(run_sweep(args))
 
 
 def main():
@@ -147,12 +299,144 @@ def main():
     )
 
     generate.add_argument(
+        "--dtype",
+        choices=SUPPORTED_DTYPES,
+        help="Floating-point precision of all stages (default: float32)",
+    )
+
+    generate.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="npz",
+    )
+
+    generate.add_argument(
+        "--level",
+        type=int,
+        default=0,
+        help="Pyramid level: run on the DEM decimated by 2**LEVEL "
+        "(default: 0, full resolution)",
+    )
+    generate.add_argument(
+        "--level-mode",
+        choices=["coarse", "upsample", "refine"],
+        default="coarse",
+        help="Output of a --level run: the coarse grid, upsampled to full "
+        "resolution, or refined with full-resolution constraints",
+    )
+
+    generate.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record per-stage time and memory to OUT/profile.json "
+        "and a Chrome trace",
+    )
+
+    generate.set_defaults(func=floods_generate_cmd)
+
+    batch = floods_sub.add_parser(
+        "batch",
+        help="Generate samples for many DEMs in a resumable worker pool",
+    )
+
+    batch.add_argument(
+        "--dems",
+        nargs="+",
+        help="DEM paths or glob patterns (quote patterns, e.g. 'tiles/*.tif')",
+    )
+    batch.add_argument(
+        "--dem-list",
+        help="File listing DEM paths (one per line, or a JSON list)",
+    )
+    batch.add_argument(
+        "--samples", type=int, required=True, help="Samples per DEM"
+    )
+    batch.add_argument(
+        "--out",
+        required=True,
+        help="Output directory; re-running resumes an interrupted run",
+    )
+
+    batch.add_argument("--config", help="YAML config file")
+    batch.add_argument("--dry-run", action="store_true")
+
+    batch.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (default: all cores)",
+    )
+    batch.add_argument(
+        "--batch-size",
+        type=int,
+        default=4,
+        help="Samples of one DEM per task (default: 4)",
+    )
+
+    batch.add_argument("--tile-size", type=int, default=256)
+    batch.add_argument("--overlap", type=int, default=64)
+    batch.add_argument(
+        "--threshold",
+        type=float,
+        help="Optional threshold to derive binary labels",
+    )
+    batch.add_argument(
+        "--dtype",
+        choices=SUPPORTED_DTYPES,
+        help="Floating-point precision of all stages (default: float32)",
+    )
+    batch.add_argument(
         "--format",
-        choices=["npz", "torch"],
+        choices=EXPORT_FORMATS,
         default="npz",
     )
 
-    generate.set_defaults(func=floods_generate)
+    batch.set_defaults(func=floods_batch_cmd)
+
+    sweep = floods_sub.add_parser(
+        "sweep",
+        help="Evaluate a grid or random search of flood specs on one DEM",
+    )
+
+    sweep.add_argument("--dem", required=True, help="Input DEM (GeoTIFF)")
+    sweep.add_argument(
+        "--space",
+        required=True,
+        help="YAML search space ('grid' or 'random' section)",
+    )
+    sweep.add_argument(
+        "--out",
+        required=True,
+        help="Results table (.csv, or .json)",
+    )
+
+    sweep.add_argument("--config", help="YAML config file of the base specs")
+    sweep.add_argument("--dry-run", action="store_true")
+
+    sweep.add_argument(
+        "--samples",
+        type=int,
+        default=1,
+        help="Samples per point; metrics are averaged (default: 1)",
+    )
+    sweep.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (0 = all cores; default: in-process)",
+    )
+    sweep.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=[0.5, 0.7],
+        help="Risk thresholds of the area-ratio metrics",
+    )
+    sweep.add_argument(
+        "--dtype",
+        choices=SUPPORTED_DTYPES,
+        help="Floating-point precision of all stages (default: float32)",
+    )
+
+    sweep.set_defaults(func=floods_sweep_cmd)
 
     args = parser.parse_args()
 
@@ -2,6 +2,7 @@ from dataclasses import asdict
 from pathlib import Path
 import yaml
 
+from geo_augment.core.precision import resolve_dtype
 from geo_augment.domains.floods.spec import (
     FloodSynthesisSpec,
     FloodConstraints,
@@ -49,6 +50,20 @@ def build_flood_specs_from_config(cfg: dict):
     return synthesis, constraints, latent
 
 
+def build_dtype_from_config(cfg: dict):
+    """
+    Top-level ``dtype`` entry (``float32`` or ``float64``), or None.
+    """
+    dtype = cfg.get("dtype")
+    if dtype is None:
+        return None
+
+    try:
+        return resolve_dtype(dtype)
+    except ValueError as e:
+        raise GeoAugmentConfigError(str(e))
+
+
 def summarize_specs(synthesis, constraints, latent) -> str:
     return (
         "GeoAugment Flood Configuration (validated)\n"
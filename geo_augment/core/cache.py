@@ -0,0 +1,150 @@
+"""
+Persistent, content-addressed cache for derived terrain features.
+
+Entries are keyed by a hash of the DEM bytes, the feature kind and its
+parameters, and the library version, and stored as ``.npy`` files that
+are memory-mapped on load. The cache directory is trimmed to a total
+size budget, evicting least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from geo_augment import __version__
+
+
+def default_cache_dir() -> Path:
+    """
+    ``$GEOAUGMENT_CACHE_DIR``, or ``~/.cache/geoaugment``.
+    """
+    env = os.environ.get("GEOAUGMENT_CACHE_DIR")
+    if env:
+        return Path(env)
+    return Path.home() / ".cache" / "geoaugment"
+
+
+def array_digest(arr: np.ndarray, chunk_bytes: int = 1 << 24) -> str:
+    """
+    Hash an array's dtype, shape and contents without copying it whole.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{arr.dtype.str}{arr.shape}".encode())
+
+    if np.ma.isMaskedArray(arr):
+        h.update(np.ma.getmaskarray(arr).tobytes())
+        arr = np.ma.getdata(arr)
+
+    flat = arr.reshape(-1) if arr.flags.c_contiguous else arr.ravel()
+    step = max(chunk_bytes // max(arr.itemsize, 1), 1)
+
+    for start in range(0, flat.size, step):
+        h.update(np.ascontiguousarray(flat[start:start + step]).data)
+
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """
+    On-disk LRU cache of feature stacks.
+
+    Parameters
+    ----------
+    root : optional path
+        Cache directory (default: ``default_cache_dir()``).
+    max_bytes : int
+        Total size budget; least recently used entries are evicted once
+        it is exceeded.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        max_bytes: int = 10 * 1024**3,
+    ):
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def key(self, kind: str, dem: np.ndarray, params: dict | None = None) -> str:
+        payload = json.dumps(
+            {
+                "kind": kind,
+                "params": params or {},
+                "version": __version__,
+                "dem": array_digest(dem),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def get(self, key: str) -> np.ndarray | None:
+        path = self._path(key)
+        try:
+            arr = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # mtime doubles as the LRU timestamp (atime is often disabled).
+        os.utime(path)
+        return arr
+
+    def put(self, key: str, arr: np.ndarray) -> np.ndarray:
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(arr))
+        os.replace(tmp, path)
+
+        self.evict(keep=path)
+        return np.load(path, mmap_mode="r")
+
+    def get_or_compute(
+        self,
+        kind: str,
+        dem: np.ndarray,
+        params: dict | None,
+        compute: Callable[[], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Return the cached stack for (kind, dem, params), computing it once.
+        """
+        key = self.key(kind, dem, params)
+        arr = self.get(key)
+        if arr is None:
+            arr = self.put(key, compute())
+        return arr
+
+    def entries(self) -> list[Path]:
+        return sorted(self.root.glob("*.npy"), key=lambda p: p.stat().st_mtime)
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*.npy"))
+
+    def evict(self, keep: Path | None = None):
+        """
+        Delete least recently used entries until within ``max_bytes``.
+        """
+        entries = self.entries()
+        total = sum(p.stat().st_size for p in entries)
+
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+
+    def clear(self):
+        for path in self.root.glob("*.npy"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,25 @@
+"""
+Optional numba acceleration for inherently sequential kernels.
+
+Kernels decorated with ``maybe_njit`` are written in the numba-compatible
+subset of Python (NumPy arrays and scalars only). When numba is
+installed they are compiled to machine code; otherwise they run as plain
+Python, which is correct but much slower on large rasters.
+"""
+
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+
+HAS_NUMBA = _njit is not None
+
+
+def maybe_njit(fn):
+    """
+    Compile ``fn`` with ``numba.njit`` when available.
+    """
+    if _njit is None:
+        return fn
+    return _njit(cache=True, nogil=True)(fn)
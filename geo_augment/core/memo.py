@@ -0,0 +1,161 @@
+"""
+In-memory memoization of pipeline stages.
+
+Each stage of a synthesis pipeline (features, latent noise, constraints,
+calibration) is keyed on exactly the spec fields it reads plus the keys
+of its upstream stages. Passing the same ``StageCache`` to repeated
+calls therefore only recomputes the stages a spec change invalidates::
+
+    memo = StageCache()
+    risk = synthesize_flood_risk(dem, spec, constraints, latent, memo=memo)
+
+    # Only calibration reruns: latent noise and constraints are reused.
+    spec = replace(spec, risk_percentile=95)
+    risk = synthesize_flood_risk(dem, spec, constraints, latent, memo=memo)
+
+Cached arrays are made read-only. Noise drawn without a ``random_seed``
+is fresh on every call, so it and every stage downstream of it are never
+memoized.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from geo_augment.core.cache import array_digest
+from geo_augment.core.profiling import stage
+
+
+DEFAULT_MEMO_BYTES = 1024 * 2**20
+
+
+class StageCache:
+    """
+    Thread-safe LRU of stage outputs, bounded in bytes.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget; least recently used outputs are evicted once it is
+        exceeded. Outputs larger than the budget are not kept.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMO_BYTES):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> np.ndarray | None:
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arr
+
+    def put(self, key, arr: np.ndarray) -> np.ndarray:
+        arr = np.asarray(arr)
+        arr.flags.writeable = False
+        if arr.nbytes > self.max_bytes:
+            return arr
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            self._entries[key] = arr
+            self.nbytes += arr.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return arr
+
+    def get_or_compute(
+        self,
+        name: str,
+        key: tuple,
+        compute: Callable[[], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Return the output of stage ``name`` for ``key``, computing it once.
+
+        ``key=None`` marks an output that must not be memoized.
+        """
+        if key is None:
+            with stage(name, memo="off") as s:
+                arr = compute()
+                s.add_array(name, arr)
+            return arr
+
+        key = (name,) + key
+        arr = self.get(key)
+        if arr is not None:
+            with stage(name, memo="hit"):
+                return arr
+
+        with stage(name, memo="miss") as s:
+            arr = self.put(key, compute())
+            s.add_array(name, arr)
+        return arr
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+def array_key(arr: np.ndarray) -> tuple:
+    """
+    Stage key of an input array (content hash, not identity).
+    """
+    return ("array", array_digest(arr))
+
+
+def latent_key(shape, synthesis_spec, latent_spec, n_samples: int, dtype) -> tuple | None:
+    """
+    Key of a latent noise stage, or None for unseeded noise.
+
+    Reads the fields shared by the flood, roads and urban specs; the
+    Perlin octave parameters only count for Perlin noise.
+    """
+    if synthesis_spec.random_seed is None:
+        return None
+
+    key = (
+        tuple(shape),
+        synthesis_spec.random_seed,
+        n_samples,
+        synthesis_spec.perturbation_strength,
+        synthesis_spec.spatial_scale,
+        latent_spec.noise_type,
+        latent_spec.normalize,
+        np.dtype(dtype).str,
+    )
+    if latent_spec.noise_type == "perlin":
+        key += (
+            latent_spec.octaves,
+            latent_spec.persistence,
+            latent_spec.lacunarity,
+        )
+    return key
+
+
+def chain_key(upstream: tuple | None, *params) -> tuple | None:
+    """
+    Key of a stage fed by ``upstream``: None stays None.
+    """
+    if upstream is None:
+        return None
+    return (upstream,) + params
@@ -0,0 +1,154 @@
+"""
+Process-pool execution for per-sample synthesis.
+
+Large read-only inputs (DEM, feature stacks) and the output stack live in
+POSIX shared memory, so workers attach to them by name instead of
+receiving pickled copies. Every sample draws from its own generator,
+spawned from one ``SeedSequence``, which makes results independent of
+how samples are split across workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable
+
+import numpy as np
+
+
+def spawn_sample_seeds(
+    random_seed: int | None,
+    n_samples: int,
+) -> list[np.random.SeedSequence]:
+    """
+    Derive one independent seed sequence per sample.
+
+    ``random_seed=None`` draws fresh OS entropy (non-reproducible).
+    """
+    return np.random.SeedSequence(random_seed).spawn(n_samples)
+
+
+class SharedArray:
+    """
+    NumPy array backed by a named shared-memory block (owner side).
+    """
+
+    def __init__(self, shape: tuple, dtype):
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.spec = (self._shm.name, tuple(shape), dtype.str)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "SharedArray":
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    def release(self):
+        """
+        Drop the local view and free the shared block.
+        """
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _attach(spec):
+    # Pool workers share the owner's resource tracker, so attaching does
+    # not transfer ownership; the owner alone unlinks the block.
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+_WORKER = {}
+
+
+def _init_worker(specs: dict, context):
+    handles = []
+    arrays = {}
+
+    for key, spec in specs.items():
+        shm, arr = _attach(spec)
+        handles.append(shm)
+        arrays[key] = arr
+
+    _WORKER.update(handles=handles, arrays=arrays, context=context)
+
+
+def _run_chunk(kernel: Callable, start: int, seeds: list):
+    arrays = _WORKER["arrays"]
+    out = arrays["out"]
+    out[start:start + len(seeds)] = kernel(arrays, _WORKER["context"], seeds)
+
+
+def _chunk_bounds(n: int, n_chunks: int):
+    step = -(-n // n_chunks)
+    return [(i, min(i + step, n)) for i in range(0, n, step)]
+
+
+def run_sample_pool(
+    kernel: Callable,
+    inputs: dict,
+    context,
+    seeds: list,
+    sample_shape: tuple,
+    workers: int | None = None,
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    Evaluate ``kernel`` for every seed, optionally across processes.
+
+    Parameters
+    ----------
+    kernel : callable
+        Module-level function ``kernel(arrays, context, seeds)`` returning
+        an array of shape ``(len(seeds),) + sample_shape``. ``arrays`` maps
+        the keys of ``inputs`` to (shared) arrays.
+    inputs : dict
+        Read-only arrays shared with workers.
+    context : object
+        Small picklable payload (specs, options) sent once per worker.
+    seeds : list
+        Per-sample seeds, usually from ``spawn_sample_seeds``.
+    workers : optional int
+        Number of processes. ``None`` or ``1`` runs in-process; ``0`` uses
+        every available core.
+
+    Returns
+    -------
+    np.ndarray
+        Shape: (len(seeds),) + sample_shape
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    if workers is None or workers <= 1 or len(seeds) <= 1:
+        return kernel(inputs, context, seeds)
+
+    workers = min(workers, len(seeds))
+    shared = {key: SharedArray.from_array(arr) for key, arr in inputs.items()}
+    shared["out"] = SharedArray((len(seeds),) + tuple(sample_shape), dtype)
+
+    try:
+        specs = {key: arr.spec for key, arr in shared.items()}
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(specs, context),
+        ) as pool:
+            futures = [
+                pool.submit(_run_chunk, kernel, start, seeds[start:stop])
+                for start, stop in _chunk_bounds(len(seeds), workers * 4)
+            ]
+            for future in futures:
+                future.result()
+
+        return shared["out"].array.copy()
+    finally:
+        for arr in shared.values():
+            arr.release()
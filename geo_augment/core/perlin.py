@@ -0,0 +1,141 @@
+"""
+Vectorized 2D gradient (Perlin) noise with octave control.
+
+Lattice gradients are derived from a hash of (seed, octave, lattice
+coordinates) rather than a permutation table, so the value at a pixel
+depends only on its global position. Any window of the field can be
+generated independently from a seed and a pixel offset, and adjacent
+windows join without seams.
+"""
+
+import numpy as np
+
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    z = x + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+def _lattice_gradients(
+    iy: np.ndarray,
+    ix: np.ndarray,
+    seed: int,
+    octave: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Unit gradient vectors on the (len(iy), len(ix)) lattice patch.
+    """
+    octave_seed = (seed ^ (octave * 0x632BE59BD9B4E019)) & _UINT64_MASK
+    key = _splitmix64(np.array([octave_seed], dtype=np.uint64))
+    h = _splitmix64(key + iy.astype(np.uint64)[:, None])
+    h = _splitmix64(h + ix.astype(np.uint64)[None, :])
+
+    angle = (h >> np.uint64(11)).astype(np.float64) * (2.0 * np.pi / 2.0**53)
+    return np.cos(angle), np.sin(angle)
+
+
+def _fade(t: np.ndarray) -> np.ndarray:
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def _gradient_octave(rows, cols, frequency, seed, octave):
+    y = rows * frequency
+    x = cols * frequency
+
+    y0 = np.floor(y)
+    x0 = np.floor(x)
+    fy = (y - y0)[:, None]
+    fx = (x - x0)[None, :]
+
+    iy = y0.astype(np.int64)
+    ix = x0.astype(np.int64)
+    iy_min, ix_min = iy.min(), ix.min()
+
+    gx, gy = _lattice_gradients(
+        np.arange(iy_min, iy.max() + 2),
+        np.arange(ix_min, ix.max() + 2),
+        seed,
+        octave,
+    )
+
+    r = iy - iy_min
+    c = ix - ix_min
+
+    def corner(g, dr, dc):
+        # Row gather then column gather: two 1D takes instead of a 2D
+        # fancy index.
+        return np.take(np.take(g, r + dr, axis=0), c + dc, axis=1)
+
+    n00 = corner(gx, 0, 0) * fx + corner(gy, 0, 0) * fy
+    n01 = corner(gx, 0, 1) * (fx - 1.0) + corner(gy, 0, 1) * fy
+    n10 = corner(gx, 1, 0) * fx + corner(gy, 1, 0) * (fy - 1.0)
+    n11 = corner(gx, 1, 1) * (fx - 1.0) + corner(gy, 1, 1) * (fy - 1.0)
+
+    u = _fade(fx)
+    v = _fade(fy)
+
+    top = n00 + u * (n01 - n00)
+    bottom = n10 + u * (n11 - n10)
+    return top + v * (bottom - top)
+
+
+def perlin_noise(
+    shape: tuple[int, int],
+    scale: float,
+    seed: int,
+    offset: tuple[int, int] = (0, 0),
+    octaves: int = 4,
+    persistence: float = 0.5,
+    lacunarity: float = 2.0,
+) -> np.ndarray:
+    """
+    Fractal gradient noise for a window of a global field.
+
+    Parameters
+    ----------
+    shape : tuple
+        Window shape (H, W).
+    scale : float
+        Wavelength of the first octave, in pixels.
+    seed : int
+        Global field seed.
+    offset : tuple
+        Global (row, col) of the window's top-left pixel.
+    octaves : int
+        Number of summed noise layers.
+    persistence : float
+        Amplitude multiplier between successive octaves.
+    lacunarity : float
+        Frequency multiplier between successive octaves.
+
+    Returns
+    -------
+    np.ndarray
+        Shape: (H, W), roughly within [-1, 1].
+    """
+    H, W = shape
+    rows = np.arange(offset[0], offset[0] + H, dtype=np.float64)
+    cols = np.arange(offset[1], offset[1] + W, dtype=np.float64)
+    seed = int(seed) & _UINT64_MASK
+
+    total = np.zeros((H, W), dtype=np.float64)
+    amplitude = 1.0
+    frequency = 1.0 / scale
+    norm = 0.0
+
+    for octave in range(octaves):
+        total += amplitude * _gradient_octave(rows, cols, frequency, seed, octave)
+        norm += amplitude
+        amplitude *= persistence
+        frequency *= lacunarity
+
+    # A single 2D Perlin octave is bounded by sqrt(2) / 2.
+    return total * (np.sqrt(2.0) / norm)
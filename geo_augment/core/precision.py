@@ -0,0 +1,74 @@
+"""
+Library-wide floating-point precision policy.
+
+Every stage (preprocessing, features, latent fields, constraints,
+calibration) computes in the policy dtype. The default is float32, which
+halves the memory of every raster-sized intermediate; float64 is an
+opt-in for callers that need the extra precision.
+
+Functions take ``dtype=None`` to mean "use the policy". Code that hands
+work to other processes resolves the dtype up front and passes it
+explicitly, since the policy is per-process state.
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+
+
+SUPPORTED_DTYPES = ("float32", "float64")
+
+_DEFAULT_DTYPE = np.dtype(np.float32)
+
+
+def _as_float_dtype(dtype) -> np.dtype:
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError:
+        raise ValueError(f"Unsupported dtype: {dtype!r}")
+
+    if dtype.name not in SUPPORTED_DTYPES:
+        raise ValueError(
+            f"Unsupported dtype '{dtype.name}'. "
+            f"Expected one of {SUPPORTED_DTYPES}"
+        )
+
+    return dtype
+
+
+def get_default_dtype() -> np.dtype:
+    return _DEFAULT_DTYPE
+
+
+def set_default_dtype(dtype) -> np.dtype:
+    """
+    Set the policy dtype for this process; returns the previous one.
+    """
+    global _DEFAULT_DTYPE
+    previous = _DEFAULT_DTYPE
+    _DEFAULT_DTYPE = _as_float_dtype(dtype)
+    return previous
+
+
+@contextmanager
+def precision(dtype):
+    """
+    Temporarily switch the policy dtype::
+
+        with precision("float64"):
+            features = stack_flood_features(dem)
+    """
+    previous = set_default_dtype(dtype)
+    try:
+        yield _DEFAULT_DTYPE
+    finally:
+        set_default_dtype(previous)
+
+
+def resolve_dtype(dtype=None) -> np.dtype:
+    """
+    ``dtype`` as a supported float dtype, or the policy dtype if None.
+    """
+    if dtype is None:
+        return _DEFAULT_DTYPE
+    return _as_float_dtype(dtype)
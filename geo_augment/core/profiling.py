@@ -0,0 +1,274 @@
+"""
+Per-stage timing and memory instrumentation.
+
+Pipeline code wraps its stages in ``stage(name)``. Nothing is recorded
+unless a profiler is active, and an inactive ``stage`` is one global
+lookup returning a shared no-op object, so instrumentation can stay in
+hot paths::
+
+    with profile() as prof:
+        risk = synthesize_flood_risk(dem, spec, constraints, latent_spec)
+
+    prof.write_json("profile.json")
+    prof.write_chrome_trace("profile.trace.json")   # chrome://tracing
+
+Each record holds wall time, process CPU time, peak traced memory above
+the level at stage entry (``tracemalloc``, when ``memory=True``) and the
+shapes and sizes of arrays attached with ``add_array``. Stages nest;
+work done in pool worker processes is not recorded.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+
+_ACTIVE = None
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_array(self, name, array):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, attrs):
+        self.profiler = profiler
+        self.record = {"name": name, "attrs": dict(attrs), "arrays": {}}
+
+    def add_array(self, name: str, array):
+        """
+        Record the shape, dtype and size of an array produced by the stage.
+        """
+        array = np.asarray(array)
+        self.record["arrays"][name] = {
+            "shape": list(array.shape),
+            "dtype": array.dtype.str,
+            "nbytes": int(array.nbytes),
+        }
+
+    def set(self, **attrs):
+        self.record["attrs"].update(attrs)
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self)
+        return False
+
+
+class Profiler:
+    """
+    Collects stage records for one run.
+
+    Parameters
+    ----------
+    memory : bool
+        Track peak allocations with ``tracemalloc`` (slows allocation
+        heavy code slightly; timing-only profiling has no such cost).
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # -----------------------------
+    # Activation
+    # -----------------------------
+
+    def start(self):
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError("Another profiler is already active")
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        _ACTIVE = self
+
+    def stop(self):
+        global _ACTIVE
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    # -----------------------------
+    # Stage bookkeeping
+    # -----------------------------
+
+    def _enter(self, stage: _Stage):
+        stack = self._stack()
+        rec = stage.record
+        rec["depth"] = len(stack)
+        rec["parent"] = stack[-1].record["name"] if stack else None
+        rec["thread"] = threading.get_ident()
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                parent = stack[-1]
+                parent._child_peak = max(parent._child_peak, peak)
+            tracemalloc.reset_peak()
+            stage._mem_start = current
+        stage._child_peak = 0
+
+        stack.append(stage)
+        rec["start_s"] = time.perf_counter() - self._origin
+        stage._cpu_start = time.process_time()
+
+    def _exit(self, stage: _Stage):
+        wall_end = time.perf_counter() - self._origin
+        rec = stage.record
+        rec["wall_s"] = wall_end - rec["start_s"]
+        rec["cpu_s"] = time.process_time() - stage._cpu_start
+
+        stack = self._stack()
+        stack.pop()
+
+        if self.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, stage._child_peak)
+            rec["peak_bytes"] = max(peak - stage._mem_start, 0)
+            if stack:
+                parent = stack[-1]
+                parent._child_peak = max(parent._child_peak, peak)
+
+        with self._lock:
+            self.records.append(rec)
+
+    # -----------------------------
+    # Reports
+    # -----------------------------
+
+    def to_dict(self) -> dict:
+        records = sorted(self.records, key=lambda r: r["start_s"])
+        return {
+            "pid": os.getpid(),
+            "memory_tracked": self.memory,
+            "stages": records,
+        }
+
+    def summary(self) -> str:
+        lines = []
+        for rec in sorted(self.records, key=lambda r: r["start_s"]):
+            mem = rec.get("peak_bytes")
+            mem_str = "" if mem is None else f"  peak {mem / 2**20:9.1f} MiB"
+            lines.append(
+                f"{'  ' * rec['depth']}{rec['name']:<{32 - 2 * rec['depth']}}"
+                f" wall {rec['wall_s']:8.3f}s  cpu {rec['cpu_s']:8.3f}s"
+                f"{mem_str}"
+            )
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def write_chrome_trace(self, path: str) -> str:
+        """
+        Write complete ("X") events in Chrome trace format.
+        """
+        pid = os.getpid()
+        events = []
+
+        for rec in self.records:
+            args = dict(rec["attrs"])
+            args.update(cpu_s=rec["cpu_s"], arrays=rec["arrays"])
+            if "peak_bytes" in rec:
+                args["peak_bytes"] = rec["peak_bytes"]
+
+            events.append({
+                "name": rec["name"],
+                "cat": rec["name"].split(".")[0],
+                "ph": "X",
+                "ts": rec["start_s"] * 1e6,
+                "dur": rec["wall_s"] * 1e6,
+                "pid": pid,
+                "tid": rec["thread"],
+                "args": args,
+            })
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+def stage(name: str, **attrs):
+    """
+    Context manager timing one pipeline stage on the active profiler.
+
+    Extra keyword arguments are stored with the record.
+    """
+    profiler = _ACTIVE
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name, attrs)
+
+
+def profiled(name: str):
+    """
+    Decorator form of ``stage`` for whole functions.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE is None:
+                return fn(*args, **kwargs)
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def active_profiler() -> Profiler | None:
+    return _ACTIVE
+
+
+@contextmanager
+def profile(memory: bool = True):
+    """
+    Activate a new ``Profiler`` for the enclosed block.
+    """
+    profiler = Profiler(memory=memory)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
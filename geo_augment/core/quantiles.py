@@ -0,0 +1,155 @@
+"""
+Mergeable quantile sketches for out-of-core percentile calibration.
+
+In-memory arrays are calibrated exactly with ``np.percentile``, which
+selects order statistics with ``np.partition`` rather than a full sort.
+That still needs the whole field in memory.
+
+``HistogramSketch`` is a fixed-bin histogram over a known value range.
+Sketches built over separate tiles, blocks or worker processes merge by
+adding counts, so percentiles of rasters that never fit in memory can be
+calibrated in a windowed, multi-process pipeline.
+
+Error bound: for data inside ``[lo, hi]``, every percentile returned by
+a sketch is within one bin width, ``(hi - lo) / n_bins``, of the exact
+``np.percentile`` result. Values outside the range are clamped into the
+edge bins and void the bound for percentiles that land there.
+"""
+
+import numpy as np
+
+
+class HistogramSketch:
+    """
+    Mergeable fixed-bin histogram for approximate percentiles.
+
+    Parameters
+    ----------
+    lo, hi : float
+        Value range covered by the bins. For unknown data, take it from a
+        cheap min/max pass first (see ``from_array``).
+    n_bins : int
+        Number of equal-width bins; the percentile error bound is
+        ``(hi - lo) / n_bins``.
+    """
+
+    def __init__(self, lo: float, hi: float, n_bins: int = 4096):
+        if not hi > lo:
+            raise ValueError("Sketch range must satisfy hi > lo")
+        if n_bins <= 0:
+            raise ValueError("n_bins must be >= 1")
+
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.n_bins = int(n_bins)
+        self.counts = np.zeros(self.n_bins, dtype=np.int64)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_array(
+        cls,
+        values: np.ndarray,
+        n_bins: int = 4096,
+        lo: float | None = None,
+        hi: float | None = None,
+    ) -> "HistogramSketch":
+        """
+        Sketch of ``values``, ranged on their min/max unless given.
+        """
+        values = np.asarray(values)
+        if lo is None:
+            lo = float(np.nanmin(values))
+        if hi is None:
+            hi = float(np.nanmax(values))
+        if not hi > lo:
+            hi = lo + 1.0
+
+        return cls(lo, hi, n_bins).update(values)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def bin_width(self) -> float:
+        return (self.hi - self.lo) / self.n_bins
+
+    def update(self, values: np.ndarray) -> "HistogramSketch":
+        """
+        Add the non-NaN entries of ``values``; returns ``self``.
+        """
+        values = np.asarray(values).reshape(-1)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+
+        bins = (values - self.lo) * (self.n_bins / (self.hi - self.lo))
+        bins = np.clip(bins, 0, self.n_bins - 1).astype(np.intp)
+        self.counts += np.bincount(bins, minlength=self.n_bins)
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def _check_compatible(self, other: "HistogramSketch"):
+        if (self.lo, self.hi, self.n_bins) != (other.lo, other.hi, other.n_bins):
+            raise ValueError("Sketches must share lo, hi and n_bins to merge")
+
+    def merge(self, other: "HistogramSketch") -> "HistogramSketch":
+        """
+        Add the counts of ``other`` (same range and bins); returns ``self``.
+        """
+        self._check_compatible(other)
+        self.counts += other.counts
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merge_all(cls, sketches) -> "HistogramSketch":
+        """
+        Merge an iterable of compatible sketches into a new one.
+        """
+        sketches = list(sketches)
+        if not sketches:
+            raise ValueError("No sketches to merge")
+
+        first = sketches[0]
+        merged = cls(first.lo, first.hi, first.n_bins)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
+
+    def _value_at_rank(self, rank: np.ndarray, cumulative: np.ndarray):
+        # Values inside a bin are taken as evenly spread over it.
+        b = np.searchsorted(cumulative, rank, side="right")
+        before = np.where(b > 0, cumulative[b - 1], 0)
+        offset = (rank - before + 0.5) / self.counts[b]
+        value = self.lo + (b + offset) * self.bin_width
+        return np.clip(value, self.min, self.max)
+
+    def percentile(self, q):
+        """
+        Approximate ``np.percentile(data, q)`` of everything sketched.
+        """
+        n = self.count
+        if n == 0:
+            raise ValueError("Cannot take a percentile of an empty sketch")
+
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 100)):
+            raise ValueError("Percentiles must be in the range [0, 100]")
+
+        cumulative = np.cumsum(self.counts)
+        rank = q / 100.0 * (n - 1)
+        lo = np.floor(rank)
+        hi = np.minimum(lo + 1, n - 1)
+
+        below = self._value_at_rank(lo, cumulative)
+        above = self._value_at_rank(hi, cumulative)
+        result = below + (above - below) * (rank - lo)
+
+        if result.ndim == 0:
+            return float(result)
+        return result
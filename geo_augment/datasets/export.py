@@ -1,11 +1,16 @@
+import json
 import os
+import tempfile
 import numpy as np
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Dict
+from geo_augment.core.profiling import profiled
 
 
+@profiled("datasets.export_npz")
 def export_npz(
     X: np.ndarray,
-    y: np.ndarray,
+    y: Optional[np.ndarray],
     out_dir: str,
     name: str = "geoaugment_flood",
     metadata: Optional[Dict] = None
@@ -21,18 +26,112 @@ def export_npz(
     if metadata is None:
         metadata = {}
 
+    arrays = {"X": X} if y is None else {"X": X, "y": y}
+
     np.savez_compressed(
         out_path,
-        X=X,
-        y=y,
+        **arrays,
         **metadata
     )
 
 
+def _write_chunk(path: str, arrays: Dict[str, np.ndarray]) -> str:
+    # zlib releases the GIL while compressing, so chunks written from a
+    # thread pool compress in parallel.
+    np.savez_compressed(
+        path,
+        **{key: np.ascontiguousarray(arr) for key, arr in arrays.items()}
+    )
+    return os.path.basename(path)
+
+
+@profiled("datasets.export_npz_chunked")
+def export_npz_chunked(
+    X: np.ndarray,
+    y: Optional[np.ndarray],
+    out_dir: str,
+    name: str = "geoaugment_flood",
+    chunk_size: int = 256,
+    workers: Optional[int] = None,
+    metadata: Optional[Dict] = None
+) -> str:
+    """
+    Export dataset as a directory of compressed .npz chunks.
+
+    Chunks of ``chunk_size`` tiles are compressed concurrently on a
+    thread pool. ``X`` and ``y`` may be memory-mapped; each chunk is only
+    read from disk when its worker picks it up.
+
+    Layout (``out_dir/name``):
+        chunk_00000.npz, chunk_00001.npz, ...
+        manifest.json
+
+    Returns
+    -------
+    str
+        Path of the chunk directory.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+
+    chunk_dir = os.path.join(out_dir, name)
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    n = len(X)
+    bounds = [(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for k, (start, stop) in enumerate(bounds):
+            arrays = {"X": X[start:stop]}
+            if y is not None:
+                arrays["y"] = y[start:stop]
+
+            futures.append(
+                pool.submit(
+                    _write_chunk,
+                    os.path.join(chunk_dir, f"chunk_{k:05d}.npz"),
+                    arrays,
+                )
+            )
+
+        files = [future.result() for future in futures]
+
+    manifest = {
+        "n_samples": n,
+        "chunk_size": chunk_size,
+        "chunks": [
+            {"file": f, "start": start, "stop": stop}
+            for f, (start, stop) in zip(files, bounds)
+        ],
+        "metadata": metadata or {},
+    }
+
+    with open(os.path.join(chunk_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return chunk_dir
+
+
+def iter_npz_chunks(chunk_dir: str) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Yield the arrays of each chunk written by ``export_npz_chunked``.
+    """
+
+    with open(os.path.join(chunk_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    for chunk in manifest["chunks"]:
+        with np.load(os.path.join(chunk_dir, chunk["file"])) as data:
+            yield {key: data[key] for key in data.files}
+
+
 # PyTorch Export
+@profiled("datasets.export_torch")
 def export_torch(
     X: np.ndarray,
-    y: np.ndarray,
+    y: Optional[np.ndarray],
     out_dir: str,
     name: str = "geoaugment_flood"
 ):
@@ -55,8 +154,131 @@ def export_torch(
     out_path = os.path.join(out_dir, f"{name}.pt")
 
     dataset = {
-        "X": torch.from_numpy(X).float(),
-        "y": torch.from_numpy(y).long()
+        "X": torch.from_numpy(np.asarray(X)).float(),
     }
+    if y is not None:
+        dataset["y"] = torch.from_numpy(np.asarray(y)).long()
 
     torch.save(dataset, out_path)
+
+
+# Cloud-Optimized GeoTIFF Export
+def _write_cog(
+    array: np.ndarray,
+    path: str,
+    georef: Optional[Dict],
+    tags: Dict,
+    resampling: str,
+    blocksize: int,
+    compress: str,
+    workers: Optional[int],
+):
+    import rasterio
+    from rasterio.shutil import copy as copy_raster
+
+    if array.ndim == 2:
+        array = array[None]
+
+    count, height, width = array.shape
+    profile = {
+        "driver": "GTiff",
+        "height": height,
+        "width": width,
+        "count": count,
+        "dtype": array.dtype.name,
+        "tiled": True,
+        "blockxsize": blocksize,
+        "blockysize": blocksize,
+        "BIGTIFF": "IF_SAFER",
+    }
+    for key in ("transform", "crs"):
+        if georef and georef.get(key) is not None:
+            profile[key] = georef[key]
+
+    # The COG driver only creates copies of existing datasets, so the
+    # surface is staged as an uncompressed tiled GeoTIFF next to ``path``.
+    fd, staging = tempfile.mkstemp(
+        suffix=".tif", dir=os.path.dirname(path) or "."
+    )
+    os.close(fd)
+
+    try:
+        with rasterio.open(staging, "w", **profile) as dst:
+            dst.write(array)
+            dst.update_tags(**{k: str(v) for k, v in tags.items()})
+
+        copy_raster(
+            staging,
+            path,
+            driver="COG",
+            COMPRESS=compress,
+            PREDICTOR="YES",
+            BLOCKSIZE=blocksize,
+            OVERVIEWS="AUTO",
+            RESAMPLING=resampling,
+            NUM_THREADS="ALL_CPUS" if workers is None else str(workers),
+            BIGTIFF="IF_SAFER",
+        )
+    finally:
+        os.remove(staging)
+
+
+@profiled("datasets.export_cog")
+def export_cog(
+    risk: np.ndarray,
+    labels: Optional[np.ndarray],
+    out_dir: str,
+    name: str = "geoaugment_flood",
+    georef: Optional[Dict] = None,
+    metadata: Optional[Dict] = None,
+    blocksize: int = 512,
+    compress: str = "DEFLATE",
+    workers: Optional[int] = None,
+) -> Dict[str, str]:
+    """
+    Export full risk (and label) rasters as Cloud-Optimized GeoTIFFs.
+
+    Writes ``{name}_risk.tif`` and, with labels, ``{name}_labels.tif``:
+    tiled, compressed, with an internal overview pyramid (averaged for
+    risk, nearest-neighbour for labels). ``risk`` is (H, W) or an
+    (N, H, W) stack written as N bands.
+
+    ``georef`` is a raster profile such as ``RasterLoader(dem).metadata()``;
+    its ``transform`` and ``crs`` are copied so the outputs overlay the
+    source DEM. ``metadata`` is stored as GeoTIFF tags. GDAL compresses
+    blocks on ``workers`` threads (default: all cores).
+
+    Requires rasterio built against GDAL >= 3.1 (COG driver).
+
+    Returns
+    -------
+    dict
+        Paths of the written files, keyed ``risk`` / ``labels``.
+    """
+
+    if blocksize <= 0 or blocksize % 16:
+        raise ValueError("blocksize must be a positive multiple of 16")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    options = {
+        "georef": georef,
+        "tags": metadata or {},
+        "blocksize": blocksize,
+        "compress": compress,
+        "workers": workers,
+    }
+
+    paths = {"risk": os.path.join(out_dir, f"{name}_risk.tif")}
+    _write_cog(np.asarray(risk), paths["risk"], resampling="AVERAGE", **options)
+
+    if labels is not None:
+        paths["labels"] = os.path.join(out_dir, f"{name}_labels.tif")
+        _write_cog(
+            np.asarray(labels, dtype=np.uint8),
+            paths["labels"],
+            resampling="NEAREST",
+            **options,
+        )
+
+    return paths
@@ -1,13 +1,94 @@
+import json
+import os
+
 import numpy as np
-from typing import Tuple, List
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Optional, Tuple
+from geo_augment.core.profiling import profiled
+
+
+def tile_origins(
+    height: int,
+    width: int,
+    tile_size: int = 256,
+    overlap: int = 0
+) -> np.ndarray:
+    """
+    Top-left (row, col) of every full tile, in row-major order.
+
+    Returns
+    -------
+    np.ndarray
+        Shape: (N, 2)
+    """
+    stride = tile_size - overlap
+    if stride <= 0:
+        raise ValueError("overlap must be smaller than tile_size")
+
+    rows = np.arange(0, height - tile_size + 1, stride)
+    cols = np.arange(0, width - tile_size + 1, stride)
+
+    grid = np.stack(np.meshgrid(rows, cols, indexing="ij"), axis=-1)
+    return grid.reshape(-1, 2)
+
+
+def tile_views(
+    features: np.ndarray,
+    labels: Optional[np.ndarray] = None,
+    tile_size: int = 256,
+    overlap: int = 0
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Zero-copy strided tile views for in-memory consumers.
+
+    Returns
+    -------
+    X : np.ndarray
+        Read-only view of shape (n_rows, n_cols, C, tile_size, tile_size)
+    y : np.ndarray or None
+        Read-only view of shape (n_rows, n_cols, tile_size, tile_size)
+    """
+    assert features.ndim == 3, "Features must be (C, H, W)"
+
+    stride = tile_size - overlap
+    if stride <= 0:
+        raise ValueError("overlap must be smaller than tile_size")
+
+    X = sliding_window_view(
+        features, (tile_size, tile_size), axis=(1, 2)
+    )[:, ::stride, ::stride]
+    X = X.transpose(1, 2, 0, 3, 4)
+
+    y = None
+    if labels is not None:
+        assert labels.ndim == 2, "Labels must be (H, W)"
+        y = sliding_window_view(labels, (tile_size, tile_size))
+        y = y[::stride, ::stride]
+
+    return X, y
+
+
+def _fill_tiles(X_out, y_out, features, labels, tile_size, overlap):
+    if not len(X_out):
+        return
 
+    X_rows, y_rows = tile_views(features, labels, tile_size, overlap)
+    n_cols = X_rows.shape[1]
 
+    for r in range(X_rows.shape[0]):
+        start = r * n_cols
+        X_out[start:start + n_cols] = X_rows[r]
+        if y_out is not None:
+            y_out[start:start + n_cols] = y_rows[r]
+
+
+@profiled("datasets.tiling")
 def tile_raster(
     features: np.ndarray,
-    labels: np.ndarray,
+    labels: Optional[np.ndarray],
     tile_size: int = 256,
     overlap: int = 0
-) -> Tuple[np.ndarray, np.ndarray]:
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
     """
     Tile feature and label rasters into fixed-size patches.
 
@@ -15,7 +96,7 @@ def tile_raster(
     ----------
     features : np.ndarray
         Feature tensor of shape (C, H, W)
-    labels : np.ndarray
+    labels : np.ndarray or None
         Label raster of shape (H, W)
     tile_size : int
         Tile height and width
@@ -26,40 +107,125 @@ def tile_raster(
     -------
     X : np.ndarray
         Feature tiles of shape (N, C, tile_size, tile_size)
-    y : np.ndarray
+    y : np.ndarray or None
         Label tiles of shape (N, tile_size, tile_size)
     """
 
     assert features.ndim == 3, "Features must be (C, H, W)"
-    assert labels.ndim == 2, "Labels must be (H, W)"
+    assert labels is None or labels.ndim == 2, "Labels must be (H, W)"
 
     C, H, W = features.shape
-    stride = tile_size - overlap
+    n_tiles = len(tile_origins(H, W, tile_size, overlap))
 
-    X_tiles: List[np.ndarray] = []
-    y_tiles: List[np.ndarray] = []
+    X = np.empty((n_tiles, C, tile_size, tile_size), dtype=features.dtype)
+    y = (
+        None if labels is None
+        else np.empty((n_tiles, tile_size, tile_size), dtype=labels.dtype)
+    )
 
-    for row in range(0, H - tile_size + 1, stride):
-        for col in range(0, W - tile_size + 1, stride):
+    _fill_tiles(X, y, features, labels, tile_size, overlap)
 
-            feat_tile = features[
-                :,
-                row:row + tile_size,
-                col:col + tile_size
-            ]
+    return X, y
 
-            label_tile = labels[
-                row:row + tile_size,
-                col:col + tile_size
-            ]
 
-            if feat_tile.shape[1:] != (tile_size, tile_size):
-                continue
+@profiled("datasets.tiling")
+def tile_raster_to_store(
+    features: np.ndarray,
+    labels: Optional[np.ndarray],
+    out_dir: str,
+    name: str = "geoaugment_flood",
+    tile_size: int = 256,
+    overlap: int = 0,
+    dtype=None,
+    metadata: Optional[dict] = None
+) -> str:
+    """
+    Tile rasters straight into a memory-mapped tile store on disk.
 
-            X_tiles.append(feat_tile)
-            y_tiles.append(label_tile)
+    The tile count is known up front, so ``X.npy`` and ``y.npy`` are
+    preallocated as ``np.memmap`` files and filled one tile row at a
+    time; peak memory is one row of tiles.
 
-    X = np.stack(X_tiles)
-    y = np.stack(y_tiles)
+    Store layout (``out_dir/name``):
+        X.npy        (N, C, tile_size, tile_size)
+        y.npy        (N, tile_size, tile_size), only if labels are given
+        origins.npy  (N, 2) top-left (row, col) of each tile
+        meta.json    tiling parameters and user metadata
 
-    return X, y
+    Returns
+    -------
+    str
+        Path of the store directory.
+    """
+
+    assert features.ndim == 3, "Features must be (C, H, W)"
+    assert labels is None or labels.ndim == 2, "Labels must be (H, W)"
+
+    C, H, W = features.shape
+    origins = tile_origins(H, W, tile_size, overlap)
+    n_tiles = len(origins)
+
+    store = os.path.join(out_dir, name)
+    os.makedirs(store, exist_ok=True)
+
+    X = np.lib.format.open_memmap(
+        os.path.join(store, "X.npy"),
+        mode="w+",
+        dtype=dtype or features.dtype,
+        shape=(n_tiles, C, tile_size, tile_size),
+    )
+    y = None
+    if labels is not None:
+        y = np.lib.format.open_memmap(
+            os.path.join(store, "y.npy"),
+            mode="w+",
+            dtype=labels.dtype,
+            shape=(n_tiles, tile_size, tile_size),
+        )
+
+    _fill_tiles(X, y, features, labels, tile_size, overlap)
+
+    X.flush()
+    if y is not None:
+        y.flush()
+
+    np.save(os.path.join(store, "origins.npy"), origins)
+
+    with open(os.path.join(store, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "n_tiles": n_tiles,
+                "tile_size": tile_size,
+                "overlap": overlap,
+                "raster_shape": [H, W],
+                "has_labels": labels is not None,
+                **(metadata or {}),
+            },
+            f,
+            indent=2,
+        )
+
+    return store
+
+
+def open_tile_store(
+    store: str,
+    mode: str = "r"
+) -> Tuple[np.ndarray, Optional[np.ndarray], dict]:
+    """
+    Memory-map a tile store written by ``tile_raster_to_store``.
+
+    Returns
+    -------
+    X, y, meta
+        ``y`` is None when the store has no labels.
+    """
+    with open(os.path.join(store, "meta.json")) as f:
+        meta = json.load(f)
+
+    X = np.load(os.path.join(store, "X.npy"), mmap_mode=mode)
+
+    y_path = os.path.join(store, "y.npy")
+    y = np.load(y_path, mmap_mode=mode) if os.path.exists(y_path) else None
+
+    return X, y, meta
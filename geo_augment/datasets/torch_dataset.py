@@ -0,0 +1,194 @@
+"""
+PyTorch datasets over GeoAugment tiles.
+
+Requires torch to be installed.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+try:
+    import torch
+    from torch.utils.data import DataLoader, Dataset
+except ImportError:
+    raise ImportError(
+        "PyTorch is not installed. "
+        "Install it to use geo_augment.datasets.torch_dataset."
+    )
+
+from geo_augment.core.parallel import spawn_sample_seeds
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.datasets.tiling import open_tile_store, tile_origins
+from geo_augment.domains.floods.api import synthesize_flood_batch
+from geo_augment.domains.floods.constraints import compute_downhill_bias
+from geo_augment.domains.floods.threshold import apply_threshold
+from geo_augment.domains.floods.validation import validate_all_flood_specs
+
+
+class TileStoreDataset(Dataset):
+    """
+    Dataset over a memory-mapped tile store (``tile_raster_to_store``).
+
+    Tiles are returned as tensors that share memory with the mapped
+    file; nothing is copied until the DataLoader collates a batch. The
+    store is opened lazily once per process, so every DataLoader worker
+    keeps its own handle, and the mapping is never pickled.
+    """
+
+    def __init__(self, store: str):
+        self.store = store
+        _, _, self.meta = open_tile_store(store)
+        self._pid = None
+        self._X = None
+        self._y = None
+
+    def __len__(self) -> int:
+        return self.meta["n_tiles"]
+
+    def _open(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            # Copy-on-write mapping: writable for torch.from_numpy, but
+            # reads come straight from the page cache.
+            self._X, self._y, _ = open_tile_store(self.store, mode="c")
+            self._pid = pid
+
+    def __getitem__(self, idx: int):
+        self._open()
+        x = torch.from_numpy(self._X[idx])
+
+        if self._y is None:
+            return x
+
+        return x, torch.from_numpy(self._y[idx])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_pid=None, _X=None, _y=None)
+        return state
+
+
+class SyntheticFloodTileDataset(Dataset):
+    """
+    Dataset that synthesizes flood risk tiles lazily from a DEM and seed.
+
+    Index ``i`` maps to sample ``i // n_tiles`` and tile ``i % n_tiles``.
+    Samples use the same per-sample seeds as ``synthesize_flood_risk``,
+    so tiles match an on-disk export of the same specs exactly.
+
+    Each process caches its ``cache_size`` most recent samples; use a
+    sequential (or per-sample grouped) sampler to avoid regenerating
+    samples. ``dtype`` is resolved once here, so workers use the
+    creating process's precision policy.
+
+    Cached samples are read-only and every tile is returned as its own
+    copy, so modifying a returned tensor in place (e.g. an in-place
+    transform) cannot corrupt the cache or tiles that are read later.
+    Tiles are small, so the copy costs far less than the synthesis.
+    ``TileStoreDataset`` stays zero-copy: its tensors map a private
+    copy-on-write view of the store.
+    """
+
+    def __init__(
+        self,
+        dem: np.ndarray,
+        synthesis_spec,
+        constraints,
+        latent_spec,
+        n_samples: int,
+        tile_size: int = 256,
+        overlap: int = 0,
+        threshold: Optional[float] = None,
+        cache_size: int = 2,
+        dtype=None,
+    ):
+        validate_all_flood_specs(
+            synthesis=synthesis_spec,
+            constraints=constraints,
+            latent=latent_spec,
+        )
+
+        self.dem = dem
+        self.synthesis_spec = synthesis_spec
+        self.constraints = constraints
+        self.latent_spec = latent_spec
+        self.threshold = threshold
+        self.tile_size = tile_size
+        self.cache_size = cache_size
+        self.dtype = resolve_dtype(dtype)
+
+        self.seeds = spawn_sample_seeds(synthesis_spec.random_seed, n_samples)
+        self.origins = tile_origins(*dem.shape, tile_size, overlap)
+        self.downhill_bias = (
+            compute_downhill_bias(dem, dtype=self.dtype)
+            if constraints.enforce_monotonic_downhill
+            else None
+        )
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.seeds) * len(self.origins)
+
+    def _sample(self, sample: int) -> np.ndarray:
+        if sample in self._cache:
+            self._cache.move_to_end(sample)
+            return self._cache[sample]
+
+        risk = synthesize_flood_batch(
+            self.dem,
+            [self.seeds[sample]],
+            self.synthesis_spec,
+            self.constraints,
+            self.latent_spec,
+            self.downhill_bias,
+            self.dtype,
+        )[0]
+        risk.flags.writeable = False
+
+        self._cache[sample] = risk
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return risk
+
+    def __getitem__(self, idx: int):
+        sample, tile = divmod(idx, len(self.origins))
+        row, col = self.origins[tile]
+        t = self.tile_size
+
+        risk = self._sample(sample)[row:row + t, col:col + t]
+        x = torch.from_numpy(risk[None].copy())
+
+        if self.threshold is None:
+            return x
+
+        return x, torch.from_numpy(apply_threshold(risk, self.threshold))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        return state
+
+
+def tile_store_loader(
+    store: str,
+    batch_size: int = 16,
+    num_workers: int = 0,
+    **kwargs
+) -> DataLoader:
+    """
+    DataLoader over a tile store with persistent workers.
+
+    Workers stay alive between epochs so each keeps its store mapping
+    open instead of reopening it every epoch.
+    """
+    return DataLoader(
+        TileStoreDataset(store),
+        batch_size=batch_size,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0,
+        **kwargs
+    )
@@ -1 +1,11 @@
-from .api import synthesize_flood_risk
+# Public names are imported on first access so that importing a submodule
+# (e.g. ``floods.spec`` for config validation) does not pull in scipy.
+
+__all__ = ["synthesize_flood_risk"]
+
+
+def __getattr__(name):
+    if name == "synthesize_flood_risk":
+        from .api import synthesize_flood_risk
+        return synthesize_flood_risk
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,198 @@
 import numpy as np
 
+from geo_augment.core.memo import StageCache, array_key, chain_key, latent_key
+from geo_augment.core.parallel import run_sample_pool, spawn_sample_seeds
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.profiling import stage
 from geo_augment.domains.floods.spec import (
     FloodSynthesisSpec,
     FloodConstraints,
     LatentFloodFieldSpec,
 )
 from geo_augment.domains.floods.validation import validate_all_flood_specs
-from geo_augment.domains.floods.latent import generate_latent_flood_field
-from geo_augment.domains.floods.constraints import apply_flood_constraints
+from geo_augment.domains.floods.latent import generate_latent_flood_fields
+from geo_augment.domains.floods.constraints import (
+    apply_flood_constraints,
+    compute_downhill_bias,
+)
 from geo_augment.domains.floods.calibration import calibrate_flood_risk
+from geo_augment.domains.floods.threshold import apply_threshold
+
+
+def synthesize_flood_batch(
+    dem: np.ndarray,
+    seeds: list,
+    synthesis_spec: FloodSynthesisSpec,
+    constraints: FloodConstraints,
+    latent_spec: LatentFloodFieldSpec,
+    downhill_bias: np.ndarray | None = None,
+    dtype=None,
+) -> np.ndarray:
+    """
+    Synthesize one (len(seeds), H, W) batch without validation.
+
+    Building block of ``synthesize_flood_risk``; passing the seeds from
+    ``spawn_sample_seeds`` reproduces its samples exactly.
+    """
+    dtype = resolve_dtype(dtype)
+
+    with stage("floods.latent", n_samples=len(seeds)) as s:
+        latent = generate_latent_flood_fields(
+            shape=dem.shape,
+            perturbation_strength=synthesis_spec.perturbation_strength,
+            spatial_scale=synthesis_spec.spatial_scale,
+            seeds=seeds,
+            latent_spec=latent_spec,
+            dtype=dtype,
+        )
+        s.add_array("latent", latent)
+
+    with stage("floods.constraints"):
+        constrained = apply_flood_constraints(
+            latent_field=latent,
+            dem=dem,
+            constraints=constraints,
+            downhill_bias=downhill_bias,
+        )
+
+    with stage("floods.calibration"):
+        risk = calibrate_flood_risk(
+            field=constrained,
+            percentile=synthesis_spec.risk_percentile,
+            value_range=synthesis_spec.value_range,
+        )
+
+    # A float64 DEM upcasts the constraint step; return the run dtype.
+    return risk.astype(dtype, copy=False)
+
+
+def _iter_batches(
+    dem,
+    seeds,
+    batch_size,
+    synthesis_spec,
+    constraints,
+    latent_spec,
+    downhill_bias,
+    dtype,
+):
+    for start in range(0, len(seeds), batch_size):
+        yield synthesize_flood_batch(
+            dem,
+            seeds[start:start + batch_size],
+            synthesis_spec,
+            constraints,
+            latent_spec,
+            downhill_bias,
+            dtype,
+        )
+
+
+def _flood_kernel(arrays: dict, context: tuple, seeds: list) -> np.ndarray:
+    synthesis_spec, constraints, latent_spec, batch_size, dtype = context
+    dem = arrays["dem"]
+
+    risk = np.empty((len(seeds),) + dem.shape, dtype=dtype)
+    start = 0
+
+    for batch in _iter_batches(
+        dem,
+        seeds,
+        batch_size,
+        synthesis_spec,
+        constraints,
+        latent_spec,
+        arrays.get("downhill_bias"),
+        dtype,
+    ):
+        risk[start:start + len(batch)] = batch
+        start += len(batch)
+
+    return risk
+
+
+def synthesize_flood_memoized(
+    dem: np.ndarray,
+    n_samples: int,
+    synthesis_spec: FloodSynthesisSpec,
+    constraints: FloodConstraints,
+    latent_spec: LatentFloodFieldSpec,
+    memo: StageCache,
+    dtype=None,
+) -> np.ndarray:
+    """
+    (n_samples, H, W) risk with every stage memoized in ``memo``.
+
+    Each stage is keyed on the spec fields it reads and on its upstream
+    stages, so after a spec change only the invalidated stages rerun
+    (e.g. a new ``risk_percentile`` only recalibrates). Samples match
+    ``synthesize_flood_risk``.
+    """
+    dtype = resolve_dtype(dtype)
+    dtype_key = dtype.str
+    seeds = spawn_sample_seeds(synthesis_spec.random_seed, n_samples)
+
+    sigma = None
+    if constraints.enforce_spatial_smoothness:
+        sigma = constraints.smoothness_kernel_size / constraints.resolution_factor
+    constraint_params = (constraints.enforce_bounds, sigma)
+
+    bias = None
+
+    if constraints.enforce_monotonic_downhill:
+        dem_key = array_key(dem)
+        bias = memo.get_or_compute(
+            "floods.downhill_bias",
+            (dem_key, dtype_key),
+            lambda: compute_downhill_bias(dem, dtype=dtype),
+        )
+        constraint_params += (dem_key, constraints.downhill_weight)
+
+    latent_k = latent_key(
+        dem.shape, synthesis_spec, latent_spec, n_samples, dtype
+    )
+    latent = memo.get_or_compute(
+        "floods.latent",
+        latent_k,
+        lambda: generate_latent_flood_fields(
+            shape=dem.shape,
+            perturbation_strength=synthesis_spec.perturbation_strength,
+            spatial_scale=synthesis_spec.spatial_scale,
+            seeds=seeds,
+            latent_spec=latent_spec,
+            dtype=dtype,
+        ),
+    )
+
+    constrained_k = chain_key(latent_k, *constraint_params)
+    constrained = memo.get_or_compute(
+        "floods.constraints",
+        constrained_k,
+        lambda: apply_flood_constraints(
+            latent_field=latent,
+            dem=dem,
+            constraints=constraints,
+            downhill_bias=bias,
+        ),
+    )
+
+    risk = memo.get_or_compute(
+        "floods.calibration",
+        chain_key(
+            constrained_k,
+            synthesis_spec.risk_percentile,
+            tuple(synthesis_spec.value_range),
+            dtype_key,
+        ),
+        lambda: calibrate_flood_risk(
+            field=constrained,
+            percentile=synthesis_spec.risk_percentile,
+            value_range=synthesis_spec.value_range,
+        ).astype(dtype, copy=False),
+    )
+
+    # Cached outputs are read-only; callers get their own copy.
+    return risk if risk.flags.writeable else risk.copy()
 
 
 def synthesize_flood_risk(
@@ -17,11 +201,45 @@ def synthesize_flood_risk(
     constraints: FloodConstraints,
     latent_spec: LatentFloodFieldSpec,
     n_samples: int = 1,
+    batch_size: int | None = None,
+    lazy: bool = False,
+    workers: int | None = None,
+    dtype=None,
+    memo: StageCache | None = None,
 ):
     """
     Generate continuous synthetic flood risk surfaces (0–1).
 
     This is the canonical GeoAugment flood synthesis API.
+
+    DEM-derived terms are computed once and samples are generated in
+    (batch_size, H, W) batches. Each sample draws from its own generator
+    spawned from ``SeedSequence(random_seed)``, so results are identical
+    for any ``batch_size`` and ``workers``.
+
+    Parameters
+    ----------
+    batch_size : optional int
+        Samples per vectorized batch. Defaults to all samples of a worker
+        at once, or 1 when ``lazy`` is set.
+    lazy : bool
+        Return an iterator yielding one (H, W) surface at a time instead
+        of a stacked array.
+    workers : optional int
+        Spread samples over this many processes (0 = all cores). The DEM
+        is shared with workers through shared memory.
+    dtype : optional numpy dtype
+        Float dtype of every stage and of the result (default: the
+        precision policy, float32 unless changed).
+    memo : optional StageCache
+        Memoize the downhill bias, latent, constraint and calibration
+        stages across calls, so repeated calls only rerun the stages a
+        spec change invalidates. Runs in-process and eagerly.
+
+    Returns
+    -------
+    np.ndarray or iterator
+        Shape: (n_samples, H, W) unless ``lazy`` is set.
     """
 
     validate_all_flood_specs(
@@ -33,33 +251,65 @@ def synthesize_flood_risk(
     if n_samples <= 0:
         raise ValueError("n_samples must be >= 1")
 
-    outputs = []
+    if lazy and workers not in (None, 1):
+        raise ValueError("lazy=True cannot be combined with workers > 1")
 
-    for i in range(n_samples):
-        latent = generate_latent_flood_field(
-            dem=dem,
-            perturbation_strength=synthesis_spec.perturbation_strength,
-            spatial_scale=synthesis_spec.spatial_scale,
-            seed=(
-                None
-                if synthesis_spec.random_seed is None
-                else synthesis_spec.random_seed + i
-            ),
-            latent_spec=latent_spec,
-        )
+    if batch_size is None:
+        batch_size = 1 if lazy else n_samples
 
-        constrained = apply_flood_constraints(
-            latent_field=latent,
-            dem=dem,
-            constraints=constraints,
+    if batch_size <= 0:
+        raise ValueError("batch_size must be >= 1")
+
+    if memo is not None and (lazy or workers not in (None, 1)):
+        raise ValueError("memo cannot be combined with lazy or workers > 1")
+
+    # Resolved here: the policy is per-process and workers may not share it.
+    dtype = resolve_dtype(dtype)
+    if memo is not None:
+        with stage("floods.synthesis", n_samples=n_samples, memo=True):
+            return synthesize_flood_memoized(
+                dem, n_samples, synthesis_spec, constraints, latent_spec,
+                memo, dtype,
+            )
+
+    seeds = spawn_sample_seeds(synthesis_spec.random_seed, n_samples)
+
+    inputs = {"dem": dem}
+    if constraints.enforce_monotonic_downhill:
+        inputs["downhill_bias"] = compute_downhill_bias(dem, dtype=dtype)
+
+    if lazy:
+        batches = _iter_batches(
+            dem,
+            seeds,
+            batch_size,
+            synthesis_spec,
+            constraints,
+            latent_spec,
+            inputs.get("downhill_bias"),
+            dtype,
         )
+        return (sample for batch in batches for sample in batch)
 
-        calibrated = calibrate_flood_risk(
-            field=constrained,
-            percentile=synthesis_spec.risk_percentile,
-            value_range=synthesis_spec.value_range,
+    with stage(
+        "floods.synthesis", n_samples=n_samples, workers=workers
+    ) as s:
+        risk = run_sample_pool(
+            _flood_kernel,
+            inputs=inputs,
+            context=(synthesis_spec, constraints, latent_spec, batch_size, dtype),
+            seeds=seeds,
+            sample_shape=dem.shape,
+            workers=workers,
+            dtype=dtype,
         )
+        s.add_array("risk", risk)
 
-        outputs.append(calibrated)
+    return risk
 
-    return outputs
+
+def synthesize_flood_labels(
+    risk: np.ndarray,
+    threshold: float = 0.6,
+):
+    return apply_threshold(risk, threshold)
@@ -1,18 +1,32 @@
 import numpy as np
 
+from geo_augment.core.quantiles import HistogramSketch
+
 
 def calibrate_flood_risk(
     field: np.ndarray,
     percentile: float,
     value_range: tuple[float, float],
+    sketch: HistogramSketch | None = None,
 ) -> np.ndarray:
     """
     Calibrate flood risk field to target percentile and value range.
+
+    An (N, H, W) batch is calibrated per sample in one vectorized step.
+
+    Pass a ``sketch`` of the full field to calibrate one block of it:
+    the percentile is then read from the sketch (within its bin width)
+    instead of from ``field``.
     """
 
     low, high = value_range
 
-    threshold = np.percentile(field, percentile)
+    if sketch is not None:
+        threshold = sketch.percentile(percentile)
+    else:
+        threshold = np.percentile(
+            field, percentile, axis=(-2, -1), keepdims=True
+        )
 
     calibrated = field / (threshold + 1e-8)
     calibrated = np.clip(calibrated, low, high)
@@ -0,0 +1,326 @@
+import warnings
+
+import numpy as np
+from scipy.ndimage import label
+
+from geo_augment.core.jit import HAS_NUMBA, maybe_njit
+from geo_augment.core.profiling import profiled
+from geo_augment.domains.floods.flow_direction import (
+    D8_OFFSETS,
+    compute_flow_direction,
+)
+
+
+_D8_ROWS = np.ascontiguousarray(D8_OFFSETS[:, 0]).astype(np.int64)
+_D8_COLS = np.ascontiguousarray(D8_OFFSETS[:, 1]).astype(np.int64)
+
+# Rasters at least this large warn when conditioning runs without numba.
+SLOW_CONDITIONING_CELLS = 1_000_000
+
+
+# --------------------------------------------------
+# Array-backed binary min-heap
+# --------------------------------------------------
+
+@maybe_njit
+def _heap_push(keys, items, size, key, item):
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 1
+        if keys[parent] <= key:
+            break
+        keys[i] = keys[parent]
+        items[i] = items[parent]
+        i = parent
+    keys[i] = key
+    items[i] = item
+    return size + 1
+
+
+@maybe_njit
+def _heap_pop(keys, items, size):
+    top = items[0]
+    size -= 1
+    key = keys[size]
+    item = items[size]
+
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and keys[child + 1] < keys[child]:
+            child += 1
+        if keys[child] >= key:
+            break
+        keys[i] = keys[child]
+        items[i] = items[child]
+        i = child
+
+    if size > 0:
+        keys[i] = key
+        items[i] = item
+
+    return top, size
+
+
+@maybe_njit
+def _priority_flood(z, closed, seeds, H, W, drow, dcol, epsilon):
+    n = z.size
+    keys = np.empty(n, dtype=np.float64)
+    items = np.empty(n, dtype=np.int64)
+    size = 0
+
+    for s in seeds:
+        closed[s] = True
+        size = _heap_push(keys, items, size, z[s], s)
+
+    while size > 0:
+        c, size = _heap_pop(keys, items, size)
+        r = c // W
+        q = c - r * W
+
+        floor = z[c]
+        if epsilon:
+            floor = np.nextafter(floor, np.inf)
+
+        for k in range(8):
+            nr = r + drow[k]
+            nq = q + dcol[k]
+            if nr < 0 or nr >= H or nq < 0 or nq >= W:
+                continue
+
+            nb = nr * W + nq
+            if closed[nb]:
+                continue
+
+            closed[nb] = True
+            if z[nb] < floor:
+                z[nb] = floor
+            size = _heap_push(keys, items, size, z[nb], nb)
+
+
+# --------------------------------------------------
+# Neighbourhood helpers
+# --------------------------------------------------
+
+def _neighbour_any(mask: np.ndarray) -> np.ndarray:
+    """
+    True where any of the 8 neighbours is True (outside counts as False).
+    """
+    H, W = mask.shape
+    padded = np.zeros((H + 2, W + 2), dtype=bool)
+    padded[1:-1, 1:-1] = mask
+
+    out = np.zeros((H, W), dtype=bool)
+    for di, dj in D8_OFFSETS:
+        out |= padded[1 + di:H + 1 + di, 1 + dj:W + 1 + dj]
+    return out
+
+
+def _neighbours(cells: np.ndarray, H: int, W: int):
+    """
+    Flat indices of all in-bounds D8 neighbours of ``cells``.
+
+    Returns (source, neighbour) pairs as two aligned 1D arrays.
+    """
+    rows = cells // W
+    cols = cells - rows * W
+
+    nr = rows[:, None] + _D8_ROWS[None, :]
+    nc = cols[:, None] + _D8_COLS[None, :]
+    inside = (nr >= 0) & (nr < H) & (nc >= 0) & (nc < W)
+
+    source = np.broadcast_to(cells[:, None], nr.shape)[inside]
+    return source, (nr * W + nc)[inside]
+
+
+def _flat_bfs(
+    starts: np.ndarray,
+    flat: np.ndarray,
+    z: np.ndarray,
+    H: int,
+    W: int,
+    start_level: int,
+) -> np.ndarray:
+    """
+    Level-synchronous BFS distance from ``starts`` through flat cells.
+
+    Only steps between cells of equal elevation. ``starts`` get
+    ``start_level``; unreached cells stay 0.
+    """
+    dist = np.zeros(H * W, dtype=np.int64)
+    visited = np.zeros(H * W, dtype=bool)
+    visited[starts] = True
+    dist[starts] = start_level
+
+    frontier = starts
+    level = start_level
+
+    while frontier.size:
+        level += 1
+        src, nb = _neighbours(frontier, H, W)
+        step = flat[nb] & ~visited[nb] & (z[nb] == z[src])
+        nb = np.unique(nb[step])
+
+        visited[nb] = True
+        dist[nb] = level
+        frontier = nb
+
+    return dist
+
+
+# --------------------------------------------------
+# Public API
+# --------------------------------------------------
+
+def fill_depressions(
+    dem: np.ndarray,
+    epsilon: bool = True,
+) -> np.ndarray:
+    """
+    Priority-Flood depression filling (Barnes et al., 2014).
+
+    Cells are processed from the raster edge inward in elevation order
+    on an array-backed heap, O(n log n). Raster borders and cells next to
+    NaN act as outlets.
+
+    Parameters
+    ----------
+    dem : np.ndarray
+        Elevation raster; NaN marks nodata.
+    epsilon : bool
+        If True, raise filled cells to the next representable float above
+        their spill point so every cell drains (Priority-Flood+ε). If
+        False, depressions become exactly flat; use ``resolve_flats``.
+
+    Returns
+    -------
+    np.ndarray
+        Filled float64 DEM of shape (H, W).
+
+    Notes
+    -----
+    The heap loop is compiled with numba when it is installed; without
+    it the same kernel runs as plain Python.
+    """
+    H, W = dem.shape
+    z = np.array(dem, dtype=np.float64).reshape(-1)
+
+    nodata = np.isnan(z).reshape(H, W)
+    edge = np.zeros((H, W), dtype=bool)
+    edge[0, :] = edge[-1, :] = edge[:, 0] = edge[:, -1] = True
+    edge |= _neighbour_any(nodata)
+    edge &= ~nodata
+
+    closed = nodata.reshape(-1).copy()
+    seeds = np.flatnonzero(edge).astype(np.int64)
+
+    _priority_flood(z, closed, seeds, H, W, _D8_ROWS, _D8_COLS, bool(epsilon))
+
+    return z.reshape(H, W)
+
+
+def resolve_flats(dem: np.ndarray) -> np.ndarray:
+    """
+    Impose drainage on flat areas (Barnes et al., 2014 flat resolution).
+
+    Every flat cell (interior, no downslope neighbour) gets an increment
+    ``2 * d_low + (max_high - d_high)``, where ``d_low`` is the BFS
+    distance from the flat's outlets and ``d_high`` the distance from
+    higher terrain. Both distances come from vectorized, level-by-level
+    BFS over flat index arrays. Increments are scaled so no flat cell
+    rises to the next higher elevation around it.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 DEM of shape (H, W) in which every drainable flat cell
+        has a D8 downslope neighbour.
+    """
+    H, W = dem.shape
+    grid = np.array(dem, dtype=np.float64)
+    valid = ~np.isnan(grid)
+
+    outlet = np.ones((H, W), dtype=bool)
+    outlet[1:-1, 1:-1] = False
+    outlet |= _neighbour_any(~valid)
+
+    flat_grid = (compute_flow_direction(grid) == -1) & valid & ~outlet
+    if not flat_grid.any():
+        return grid
+
+    z = grid.reshape(-1)
+    flat = flat_grid.reshape(-1)
+    valid = valid.reshape(-1)
+    cells = np.flatnonzero(flat)
+
+    src, nb = _neighbours(cells, H, W)
+    low_edges = np.unique(nb[~flat[nb] & valid[nb] & (z[nb] == z[src])])
+    higher = z[nb] > z[src]
+    high_edges = np.unique(src[higher])
+
+    d_low = _flat_bfs(low_edges, flat, z, H, W, start_level=0)[cells]
+    d_high = _flat_bfs(high_edges, flat, z, H, W, start_level=1)[cells]
+
+    labels, n_flats = label(flat_grid, structure=np.ones((3, 3)))
+    labels = labels.reshape(-1)[cells]
+
+    max_high = np.zeros(n_flats + 1, dtype=np.int64)
+    np.maximum.at(max_high, labels, d_high)
+
+    away_from_high = np.where(d_high > 0, max_high[labels] - d_high, 0)
+    increment = np.where(d_low > 0, 2 * d_low + away_from_high, 0)
+
+    max_inc = int(increment.max())
+    if max_inc == 0:
+        return grid
+
+    gaps = (z[nb] - z[src])[higher]
+    if gaps.size:
+        delta = gaps.min() / (max_inc + 1)
+    else:
+        delta = 2.0 * np.spacing(np.abs(z[cells]).max())
+
+    z[cells] += increment * delta
+
+    return grid
+
+
+@profiled("floods.conditioning")
+def condition_dem(
+    dem: np.ndarray,
+    method: str = "epsilon",
+) -> np.ndarray:
+    """
+    Hydrologically condition a DEM before D8 routing.
+
+    Parameters
+    ----------
+    method : str
+        'epsilon' - Priority-Flood+ε (fills pits and drains flats in one
+        pass);
+        'flat' - flat Priority-Flood followed by ``resolve_flats``.
+
+    Without numba (``pip install geoaugment[jit]``) both methods run as
+    pure Python and warn on rasters of ``SLOW_CONDITIONING_CELLS`` cells
+    or more.
+    """
+    if not HAS_NUMBA and np.size(dem) >= SLOW_CONDITIONING_CELLS:
+        warnings.warn(
+            f"Conditioning a {'x'.join(map(str, np.shape(dem)))} DEM "
+            "without numba runs as pure Python and may take minutes; "
+            "install it with `pip install geoaugment[jit]`.",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+
+    if method == "epsilon":
+        return fill_depressions(dem, epsilon=True)
+
+    if method == "flat":
+        return resolve_flats(fill_depressions(dem, epsilon=False))
+
+    raise ValueError(
+        f"method='{method}' is invalid. Allowed values: ['epsilon', 'flat']"
+    )
@@ -1,29 +1,51 @@
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.io.preprocess import fill_nodata
+
+
+def compute_downhill_bias(dem: np.ndarray, dtype=None) -> np.ndarray:
+    """
+    Per-DEM downhill bias term (1 at the lowest cell, 0 at the highest).
+
+    Masked cells of a masked DEM are filled like ``prepare_dem`` does.
+    """
+    dtype = resolve_dtype(dtype)
+    if np.ma.isMaskedArray(dem):
+        dem = fill_nodata(dem, dtype=dtype)
+    dem = dem.astype(dtype, copy=False)
+    elevation_norm = (dem - dem.min()) / (dem.max() - dem.min() + 1e-8)
+    return 1.0 - elevation_norm
+
 
 def apply_flood_constraints(
     latent_field: np.ndarray,
     dem: np.ndarray,
     constraints,
+    downhill_bias: np.ndarray | None = None,
 ) -> np.ndarray:
     """
     Apply physical and statistical constraints to latent flood field.
+
+    ``latent_field`` may be a single (H, W) field or an (N, H, W) batch;
+    smoothing only acts on the spatial axes. Pass a precomputed
+    ``downhill_bias`` to reuse it across calls on the same DEM.
     """
 
     field = latent_field.copy()
 
     if constraints.enforce_monotonic_downhill:
-        elevation_norm = (dem - dem.min()) / (dem.max() - dem.min() + 1e-8)
-        downhill_bias = 1.0 - elevation_norm
+        if downhill_bias is None:
+            downhill_bias = compute_downhill_bias(dem, dtype=field.dtype)
         field = field + constraints.downhill_weight * downhill_bias
 
     if constraints.enforce_spatial_smoothness:
-        field = gaussian_filter(field, sigma=constraints.smoothness_kernel_size)
+        k = constraints.smoothness_kernel_size / constraints.resolution_factor
+        sigma = (0,) * (field.ndim - 2) + (k, k)
+        field = gaussian_filter(field, sigma=sigma)
 
     if constraints.enforce_bounds:
         field = np.clip(field, 0.0, 1.0)
 
     return field
-
-    
\ No newline at end of file
@@ -1,7 +1,13 @@
+import os
+
 import numpy as np
 from scipy.ndimage import sobel
 
+from geo_augment.core.cache import FeatureCache
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.profiling import profiled
 from geo_augment.io.preprocess import prepare_dem, normalize_minmax
+from geo_augment.domains.floods.conditioning import condition_dem
 from geo_augment.domains.floods.flow_direction import compute_flow_direction
 from geo_augment.domains.floods.flow_accumulation import compute_flow_accumulation
 from geo_augment.domains.floods.risk import compute_flood_risk
@@ -17,7 +23,13 @@ def compute_slope(dem: np.ndarray) -> np.ndarray:
     return slope
 
 
-def stack_flood_features(dem: np.ndarray) -> np.ndarray:
+@profiled("floods.features")
+def stack_flood_features(
+    dem: np.ndarray,
+    cache: FeatureCache | None = None,
+    conditioning: str | None = None,
+    dtype=None,
+) -> np.ndarray:
     """
     Stack flood-relevant terrain features.
 
@@ -25,6 +37,16 @@ def stack_flood_features(dem: np.ndarray) -> np.ndarray:
     ----------
     dem : np.ndarray
         Raw digital elevation model.
+    cache : optional FeatureCache
+        Reuse a stack previously computed for identical DEM bytes. Cached
+        stacks are returned as read-only memory maps.
+    conditioning : optional str
+        Hydrologically condition the DEM before flow routing
+        ('epsilon' or 'flat', see ``condition_dem``). Elevation and slope
+        channels always use the unconditioned DEM.
+    dtype : optional numpy dtype
+        Float dtype of every stage and of the result (default: the
+        precision policy, float32 unless changed).
 
     Returns
     -------
@@ -45,24 +67,40 @@ def stack_flood_features(dem: np.ndarray) -> np.ndarray:
     - Not flood predictions
     """
 
+    dtype = resolve_dtype(dtype)
+
+    if cache is not None:
+        return cache.get_or_compute(
+            "flood_features",
+            dem,
+            {"conditioning": conditioning, "dtype": dtype.name},
+            lambda: stack_flood_features(
+                dem, conditioning=conditioning, dtype=dtype
+            ),
+        )
+
     # -----------------------------
     # 1. Preprocess DEM
     # -----------------------------
-    dem = prepare_dem(dem)
-    elevation = normalize_minmax(dem)
+    dem = prepare_dem(dem, dtype=dtype)
+    elevation = normalize_minmax(dem, dtype=dtype)
 
     # -----------------------------
     # 2. Slope
     # -----------------------------
     slope_raw = compute_slope(elevation)
-    slope = normalize_minmax(slope_raw)
+    slope = normalize_minmax(slope_raw, dtype=dtype)
 
     # -----------------------------
     # 3. Flow accumulation
     # -----------------------------
-    flow_dir = compute_flow_direction(elevation)
+    routing_dem = (
+        elevation if conditioning is None
+        else condition_dem(elevation, method=conditioning)
+    )
+    flow_dir = compute_flow_direction(routing_dem)
     flow_acc_raw = compute_flow_accumulation(flow_dir)
-    flow_acc = normalize_minmax(flow_acc_raw)
+    flow_acc = normalize_minmax(flow_acc_raw, dtype=dtype)
 
     # -----------------------------
     # 4. Base flood risk proxy
@@ -77,3 +115,179 @@ def stack_flood_features(dem: np.ndarray) -> np.ndarray:
         [elevation, slope, flow_acc, risk],
         axis=0,
     )
+
+
+# Sobel gradients and D8 directions both read a 3x3 neighbourhood, so a
+# one-pixel halo makes every block interior identical to the full raster.
+FEATURE_HALO = 1
+
+
+def _iter_blocks(H: int, W: int, block_size: int):
+    for r0 in range(0, H, block_size):
+        for c0 in range(0, W, block_size):
+            yield r0, min(r0 + block_size, H), c0, min(c0 + block_size, W)
+
+
+def _read_halo_block(loader, r0, r1, c0, c1, H, W, halo=FEATURE_HALO):
+    """
+    Read a block plus halo as float64 with nodata as NaN.
+
+    Halo cells outside the raster are mirrored ("symmetric"), which is
+    the boundary rule ``scipy.ndimage`` uses by default.
+    """
+    top, left = max(r0 - halo, 0), max(c0 - halo, 0)
+    bottom, right = min(r1 + halo, H), min(c1 + halo, W)
+
+    block = loader.read_window(
+        top, left, (bottom - top, right - left), masked=True
+    )
+    block = np.ma.filled(np.ma.asarray(block).astype(np.float64), np.nan)
+
+    pad = (
+        (halo - (r0 - top), halo - (bottom - r1)),
+        (halo - (c0 - left), halo - (right - c1)),
+    )
+    if any(p for axis in pad for p in axis):
+        block = np.pad(block, pad, mode="symmetric")
+
+    return block
+
+
+def _scale(values: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+    if vmax - vmin < 1e-8:
+        return np.zeros_like(values)
+    return (values - vmin) / (vmax - vmin)
+
+
+@profiled("floods.features_windowed")
+def stack_flood_features_windowed(
+    loader,
+    out_path: str,
+    block_size: int = 1024,
+    dtype=None,
+) -> np.ndarray:
+    """
+    Windowed version of ``stack_flood_features`` for rasters larger than RAM.
+
+    Parameters
+    ----------
+    loader : RasterLoader
+        Source DEM, read block by block with ``read_window``.
+    out_path : str
+        Destination ``.npy`` file for the ``(4, H, W)`` feature store.
+    block_size : int
+        Block height and width in pixels.
+    dtype : optional numpy dtype
+        Storage dtype of the feature channels (default: the precision
+        policy). Blocks are computed in float64 either way.
+
+    Returns
+    -------
+    np.memmap
+        Shape: (4, H, W), same channels as ``stack_flood_features``.
+
+    Notes
+    -----
+    Blocks are read with a ``FEATURE_HALO`` pixel halo so slope and flow
+    direction match the full-raster result at tile seams. Global
+    statistics (nodata fill value, min/max normalization) are gathered in
+    a first streaming pass. Flow accumulation is the one non-local stage:
+    it runs over a memory-mapped int8 direction grid and needs about
+    9 bytes per cell of working memory, independent of ``block_size``.
+    """
+    if block_size <= 0:
+        raise ValueError("block_size must be > 0")
+
+    H, W = loader.shape
+    dtype = resolve_dtype(dtype)
+
+    # -----------------------------
+    # 1. Global DEM statistics
+    # -----------------------------
+    total, count = 0.0, 0
+    dem_min, dem_max = np.inf, -np.inf
+
+    for r0, r1, c0, c1 in _iter_blocks(H, W, block_size):
+        block = _read_halo_block(loader, r0, r1, c0, c1, H, W, halo=0)
+        valid = block[~np.isnan(block)]
+        if valid.size:
+            total += float(valid.sum())
+            count += valid.size
+            dem_min = min(dem_min, float(valid.min()))
+            dem_max = max(dem_max, float(valid.max()))
+
+    fill_value = total / count if count else np.nan
+
+    store = np.lib.format.open_memmap(
+        out_path, mode="w+", dtype=dtype, shape=(4, H, W)
+    )
+    flow_dir_path = f"{out_path}.flowdir.tmp"
+    flow_dir = np.lib.format.open_memmap(
+        flow_dir_path, mode="w+", dtype=np.int8, shape=(H, W)
+    )
+
+    try:
+        # -----------------------------
+        # 2. Elevation, slope, flow direction
+        # -----------------------------
+        slope_min, slope_max = np.inf, -np.inf
+        h = FEATURE_HALO
+
+        for r0, r1, c0, c1 in _iter_blocks(H, W, block_size):
+            block = _read_halo_block(loader, r0, r1, c0, c1, H, W)
+            block[np.isnan(block)] = fill_value
+            elevation = _scale(block, dem_min, dem_max)
+
+            slope = compute_slope(elevation)[h:-h, h:-h]
+            slope_min = min(slope_min, float(slope.min()))
+            slope_max = max(slope_max, float(slope.max()))
+
+            directions = compute_flow_direction(elevation)[h:-h, h:-h]
+            if r0 == 0:
+                directions[0, :] = -1
+            if r1 == H:
+                directions[-1, :] = -1
+            if c0 == 0:
+                directions[:, 0] = -1
+            if c1 == W:
+                directions[:, -1] = -1
+
+            store[0, r0:r1, c0:c1] = elevation[h:-h, h:-h]
+            store[1, r0:r1, c0:c1] = slope
+            flow_dir[r0:r1, c0:c1] = directions
+
+        # -----------------------------
+        # 3. Flow accumulation (global)
+        # -----------------------------
+        flow_dir.flush()
+        flow_acc = compute_flow_accumulation(flow_dir)
+        acc_min, acc_max = float(flow_acc.min()), float(flow_acc.max())
+        store[2] = flow_acc
+        del flow_acc
+
+        # -----------------------------
+        # 4. Normalization and risk proxy
+        # -----------------------------
+        for r0, r1, c0, c1 in _iter_blocks(H, W, block_size):
+            slope = _scale(
+                store[1, r0:r1, c0:c1].astype(np.float64), slope_min, slope_max
+            )
+            flow_acc = _scale(
+                store[2, r0:r1, c0:c1].astype(np.float64), acc_min, acc_max
+            )
+            risk = compute_flood_risk(
+                elevation=store[0, r0:r1, c0:c1].astype(np.float64),
+                slope=slope,
+                flow_acc=flow_acc,
+            )
+
+            store[1, r0:r1, c0:c1] = slope
+            store[2, r0:r1, c0:c1] = flow_acc
+            store[3, r0:r1, c0:c1] = risk
+
+        store.flush()
+    finally:
+        del flow_dir
+        os.remove(flow_dir_path)
+
+    return store
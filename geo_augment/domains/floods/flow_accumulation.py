@@ -1,44 +1,91 @@
 import numpy as np
 from geo_augment.domains.floods.flow_direction import D8_OFFSETS
+from geo_augment.core.profiling import profiled
 
 
+def compute_in_degree(flow_dir: np.ndarray) -> np.ndarray:
+    """
+    Count how many D8 neighbours drain into each cell.
+
+    Returns:
+        indeg: uint8 array of shape (H, W), values in [0..8]
+    """
+    H, W = flow_dir.shape
+    indeg = np.zeros((H, W), dtype=np.uint8)
+
+    for k, (di, dj) in enumerate(D8_OFFSETS):
+        src = flow_dir[
+            max(0, -di):H - max(0, di),
+            max(0, -dj):W - max(0, dj),
+        ]
+        dst = indeg[
+            max(0, di):H + min(0, di),
+            max(0, dj):W + min(0, dj),
+        ]
+        dst += src == k
+
+    return indeg
+
+
+@profiled("floods.flow_accumulation")
 def compute_flow_accumulation(flow_dir: np.ndarray) -> np.ndarray:
     """
-    Compute flow accumulation using recursive upstream counting.
-    
+    Compute flow accumulation in topological (Kahn) order.
+
+    Cells are released level by level once every upstream neighbour has
+    been counted, so no recursion or per-cell Python objects are needed.
+    Downstream targets are derived from ``flow_dir`` on the fly; the
+    working set is the in-degree array, an integer count array and the
+    current frontier of flat indices.
+
     Returns:
         acc: float array of shape (H, W)
     """
     H, W = flow_dir.shape
-    acc = np.ones((H, W), dtype=np.float32)
+    n = H * W
+
+    index_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+    flat_dir = np.ascontiguousarray(flow_dir).reshape(-1)
+    indeg = compute_in_degree(flow_dir).reshape(-1)
+    counts = np.ones(n, dtype=np.uint32 if n < 2**32 else np.uint64)
+
+    frontier = np.flatnonzero(indeg == 0).astype(index_dtype, copy=False)
+
+    while frontier.size:
+        d = flat_dir[frontier]
+        draining = d >= 0
+        src = frontier[draining]
+        d = d[draining]
 
-    # Build reverse flow graph
-    upstream = [[[] for _ in range(W)] for _ in range(H)]
+        rows = src // W
+        cols = src - rows * W
+        t_rows = rows + D8_OFFSETS[d, 0]
+        t_cols = cols + D8_OFFSETS[d, 1]
 
-    for i in range(H):
-        for j in range(W):
-            d = flow_dir[i, j]
-            if d >= 0:
-                di, dj = D8_OFFSETS[d]
-                ni, nj = i + di, j + dj
-                if 0 <= ni < H and 0 <= nj < W:
-                    upstream[ni][nj].append((i, j))
+        inside = (t_rows >= 0) & (t_rows < H) & (t_cols >= 0) & (t_cols < W)
+        src = src[inside]
+        targets = (t_rows[inside] * W + t_cols[inside]).astype(
+            index_dtype, copy=False
+        )
 
-    visited = np.zeros((H, W), dtype=bool)
+        if not targets.size:
+            break
 
-    def dfs(i, j):
-        if visited[i, j]:
-            return acc[i, j]
-        visited[i, j] = True
+        order = np.argsort(targets, kind="stable")
+        targets = targets[order]
+        src = src[order]
 
-        for ui, uj in upstream[i][j]:
-            acc[i, j] += dfs(ui, uj)
+        starts = np.flatnonzero(
+            np.concatenate(([True], targets[1:] != targets[:-1]))
+        )
+        unique_targets = targets[starts]
 
-        return acc[i, j]
+        counts[unique_targets] += np.add.reduceat(counts[src], starts)
+        indeg[unique_targets] -= np.diff(
+            np.append(starts, targets.size)
+        ).astype(np.uint8)
 
-    for i in range(H):
-        for j in range(W):
-            if not visited[i, j]:
-                dfs(i, j)
+        frontier = unique_targets[indeg[unique_targets] == 0]
 
-    return acc
+    return counts.reshape(H, W).astype(np.float32)
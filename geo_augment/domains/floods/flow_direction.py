@@ -1,4 +1,5 @@
 import numpy as np
+from geo_augment.core.profiling import profiled
 
 
 # Clockwise from North
@@ -14,30 +15,47 @@ D8_OFFSETS = np.array([
 ])
 
 
+@profiled("floods.flow_direction")
 def compute_flow_direction(dem: np.ndarray) -> np.ndarray:
     """
     Compute D8 flow direction.
-    
+
+    All eight neighbour drops are evaluated as whole-array operations on
+    shifted views of the DEM, keeping a running steepest drop per cell.
+    Ties resolve to the first direction in ``D8_OFFSETS`` order.
+
     Returns:
         flow_dir: int array of shape (H, W)
-                  values in [0..7], -1 for sinks
+                  values in [0..7], -1 for sinks, flats,
+                  border cells and cells touching NaN
     """
     H, W = dem.shape
     flow_dir = -1 * np.ones((H, W), dtype=np.int8)
 
-    for i in range(1, H - 1):
-        for j in range(1, W - 1):
-            center = dem[i, j]
-            drops = []
+    if H < 3 or W < 3:
+        return flow_dir
+
+    center = dem[1:H - 1, 1:W - 1]
+
+    best_drop = np.zeros(center.shape, dtype=np.result_type(dem.dtype, np.float32))
+    best_dir = flow_dir[1:H - 1, 1:W - 1]
+    invalid = np.isnan(center) if np.issubdtype(dem.dtype, np.floating) else None
+
+    drop = np.empty_like(best_drop)
+    steeper = np.empty(center.shape, dtype=bool)
+
+    for k, (di, dj) in enumerate(D8_OFFSETS):
+        neighbour = dem[1 + di:H - 1 + di, 1 + dj:W - 1 + dj]
+        np.subtract(center, neighbour, out=drop)
 
-            for k, (di, dj) in enumerate(D8_OFFSETS):
-                ni, nj = i + di, j + dj
-                drops.append(center - dem[ni, nj])
+        if invalid is not None:
+            invalid |= np.isnan(drop)
 
-            drops = np.array(drops)
-            max_drop = drops.max()
+        np.greater(drop, best_drop, out=steeper)
+        np.copyto(best_drop, drop, where=steeper)
+        np.copyto(best_dir, np.int8(k), where=steeper)
 
-            if max_drop > 0:
-                flow_dir[i, j] = int(drops.argmax())
+    if invalid is not None:
+        best_dir[invalid] = -1
 
     return flow_dir
@@ -1,32 +1,100 @@
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
+from geo_augment.core.perlin import perlin_noise
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.spectral import spectral_gaussian_filter
+
 
 def generate_latent_flood_field(
     dem: np.ndarray,
     perturbation_strength: float,
     spatial_scale: float,
-    seed: int | None,
+    seed,
     latent_spec,
+    dtype=None,
 ) -> np.ndarray:
     """
     Generate a latent flood potential field.
+
+    ``seed`` is anything ``np.random.default_rng`` accepts (int,
+    ``SeedSequence``, ``Generator`` or None); global state is untouched.
+    """
+
+    return generate_latent_flood_fields(
+        shape=dem.shape,
+        perturbation_strength=perturbation_strength,
+        spatial_scale=spatial_scale,
+        seeds=[seed],
+        latent_spec=latent_spec,
+        dtype=dtype,
+    )[0]
+
+
+def generate_latent_flood_fields(
+    shape: tuple,
+    perturbation_strength: float,
+    spatial_scale: float,
+    seeds: list,
+    latent_spec,
+    offset: tuple[int, int] = (0, 0),
+    dtype=None,
+) -> np.ndarray:
+    """
+    Generate a batch of latent flood potential fields.
+
+    Each sample draws from its own generator, so sample ``i`` is
+    identical to ``generate_latent_flood_field`` called with ``seeds[i]``.
+
+    With ``noise_type='perlin'``, ``shape`` and ``offset`` describe a
+    window of a global field: windows generated with the same seed join
+    without seams. Min/max normalization is per window, so tiled callers
+    should disable ``latent_spec.normalize``.
+
+    Noise is drawn in float64 one sample at a time and stored in
+    ``dtype`` (default: the precision policy), so float32 batches see
+    the same random values as float64 ones.
+
+    Returns
+    -------
+    np.ndarray
+        Shape: (N, H, W) with N = len(seeds)
     """
 
-    if seed is not None:
-        np.random.seed(seed)
+    noise = np.empty((len(seeds),) + tuple(shape), dtype=resolve_dtype(dtype))
 
-    noise = np.random.normal(
-        loc=0.0,
-        scale=perturbation_strength,
-        size=dem.shape,
-    )
+    for i, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
 
-    smooth_noise = gaussian_filter(noise, sigma=spatial_scale)
+        if latent_spec.noise_type == "perlin":
+            noise[i] = perturbation_strength * perlin_noise(
+                shape,
+                scale=spatial_scale,
+                seed=rng.integers(2**63),
+                offset=offset,
+                octaves=latent_spec.octaves,
+                persistence=latent_spec.persistence,
+                lacunarity=latent_spec.lacunarity,
+            )
+        else:
+            noise[i] = rng.normal(
+                loc=0.0,
+                scale=perturbation_strength,
+                size=shape,
+            )
 
-    latent = smooth_noise
+    if latent_spec.noise_type == "perlin":
+        latent = noise
+    elif latent_spec.noise_type == "spectral":
+        latent = spectral_gaussian_filter(noise, spatial_scale)
+    else:
+        latent = gaussian_filter(
+            noise, sigma=(0, spatial_scale, spatial_scale)
+        )
 
     if latent_spec.normalize:
-        latent = (latent - latent.min()) / (latent.max() - latent.min() + 1e-8)
+        lo = latent.min(axis=(-2, -1), keepdims=True)
+        hi = latent.max(axis=(-2, -1), keepdims=True)
+        latent = (latent - lo) / (hi - lo + 1e-8)
 
     return latent
@@ -1,5 +1,7 @@
 import numpy as np
 
+from geo_augment.io.preprocess import masked_to_nan
+
 
 def sigmoid(x: np.ndarray) -> np.ndarray:
     return 1.0 / (1.0 + np.exp(-x))
@@ -38,6 +40,10 @@ def compute_flood_risk(
             "acc": 1.5
         }
 
+    elevation, slope, flow_acc = (
+        masked_to_nan(a) for a in (elevation, slope, flow_acc)
+    )
+
     score = (
         weights["elev"] * (1.0 - elevation) +
         weights["slope"] * (1.0 - slope) +
@@ -81,6 +81,13 @@ class FloodConstraints:
     Strength of downhill bias relative to other factors.
     """
 
+    resolution_factor: float = 1.0
+    """
+    Pixel size relative to the resolution the kernel size is given for
+    (2.0 = pixels twice as large). The smoothing sigma is
+    ``smoothness_kernel_size / resolution_factor``; set by pyramid runs.
+    """
+
 # Latent field configuration
 @dataclass(frozen=True)
 class LatentFloodFieldSpec:
@@ -104,6 +111,21 @@ class LatentFloodFieldSpec:
 
     """
 
+    octaves: int = 4
+    """
+    Number of summed layers for 'perlin' noise.
+    """
+
+    persistence: float = 0.5
+    """
+    Amplitude multiplier between 'perlin' octaves.
+    """
+
+    lacunarity: float = 2.0
+    """
+    Frequency multiplier between 'perlin' octaves.
+    """
+
 DEFAULT_FLOOD_SPEC = FloodSynthesisSpec(
     perturbation_strength=0.15,
     spatial_scale=30.0,
@@ -0,0 +1,499 @@
+"""
+Parameter sweeps over the flood specs with shared work.
+
+A sweep evaluates many combinations ("points") of fields of
+``FloodSynthesisSpec``, ``FloodConstraints`` and ``LatentFloodFieldSpec``
+on one DEM. Points come from ``grid_space`` (every combination of the
+listed values) or ``random_space`` (random draws), and each point
+overrides fields of a base spec triple.
+
+Work is shared by exploiting the linearity of the pipeline up to the
+final clip of the constraint stage:
+
+- the latent field is linear in ``perturbation_strength``, and min/max
+  normalization is affine, so one unit-strength field ``B`` per noise
+  configuration serves every strength: ``latent = a * B + b``
+- the constraint smoothing is linear too, so ``B`` and the downhill bias
+  are smoothed once per kernel and every (strength, ``downhill_weight``)
+  pair is an axpy followed by the clip
+- calibration divides by a percentile of the constrained field, so one
+  constrained field serves every ``risk_percentile`` (all read with one
+  ``np.percentile`` call) and ``value_range``
+
+Groups of points sharing a noise configuration run in parallel
+processes. Every combination matches ``synthesize_flood_risk`` with the
+same specs up to floating-point rounding, and all points use the same
+seeds (common random numbers), so differences between points come from
+the parameters alone.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+from geo_augment.core.parallel import spawn_sample_seeds
+from geo_augment.core.precision import resolve_dtype, set_default_dtype
+from geo_augment.core.profiling import profiled
+from geo_augment.domains.floods.constraints import compute_downhill_bias
+from geo_augment.domains.floods.latent import generate_latent_flood_fields
+from geo_augment.domains.floods.spec import (
+    FloodSynthesisSpec,
+    FloodConstraints,
+    LatentFloodFieldSpec,
+)
+from geo_augment.domains.floods.validation import validate_all_flood_specs
+
+
+SECTIONS = {
+    "synthesis": FloodSynthesisSpec,
+    "constraints": FloodConstraints,
+    "latent": LatentFloodFieldSpec,
+}
+
+# Field name -> section; names are unique across the three specs.
+SWEEPABLE = {
+    f.name: section
+    for section, cls in SECTIONS.items()
+    for f in fields(cls)
+}
+
+DEFAULT_THRESHOLDS = (0.5, 0.7)
+
+
+# -----------------------------
+# Search spaces
+# -----------------------------
+
+def _check_names(names):
+    unknown = sorted(set(names) - set(SWEEPABLE))
+    if unknown:
+        raise ValueError(
+            f"Unknown sweep parameter(s) {unknown}; expected fields of "
+            "FloodSynthesisSpec, FloodConstraints or LatentFloodFieldSpec"
+        )
+
+
+def grid_space(axes: dict) -> list[dict]:
+    """
+    Every combination of the listed values, e.g.
+    ``{"perturbation_strength": [0.1, 0.2], "risk_percentile": [85, 90]}``.
+    """
+    _check_names(axes)
+    if not axes:
+        return [{}]
+
+    names = list(axes)
+    values = [list(axes[name]) for name in names]
+    if any(not v for v in values):
+        raise ValueError("Every grid axis needs at least one value")
+
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def _draw(rng, name, axis):
+    if isinstance(axis, dict):
+        low, high = float(axis["low"]), float(axis["high"])
+        if low > high:
+            raise ValueError(f"{name}: low must be <= high")
+
+        if axis.get("log", False):
+            if low <= 0:
+                raise ValueError(f"{name}: log-uniform ranges need low > 0")
+            value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            value = float(rng.uniform(low, high))
+
+        if axis.get("integer", False):
+            value = int(round(value))
+        return value
+
+    choices = list(axis)
+    if not choices:
+        raise ValueError(f"{name}: needs at least one choice")
+    return choices[rng.integers(len(choices))]
+
+
+def random_space(axes: dict, n_points: int, seed: int | None = None) -> list[dict]:
+    """
+    ``n_points`` random points.
+
+    Each axis is a list of choices (drawn uniformly) or a range
+    ``{"low": ..., "high": ...}`` drawn uniformly, or log-uniformly with
+    ``"log": true``; ``"integer": true`` rounds the draw.
+    """
+    _check_names(axes)
+    if n_points <= 0:
+        raise ValueError("n_points must be >= 1")
+
+    rng = np.random.default_rng(seed)
+    return [
+        {name: _draw(rng, name, axis) for name, axis in axes.items()}
+        for _ in range(n_points)
+    ]
+
+
+def space_from_config(cfg: dict) -> list[dict]:
+    """
+    Points from a sweep config with either a ``grid`` mapping of value
+    lists or a ``random`` mapping of ``params``, ``n_points`` and an
+    optional ``seed``.
+    """
+    if ("grid" in cfg) == ("random" in cfg):
+        raise ValueError("Sweep config needs exactly one of 'grid' or 'random'")
+
+    if "grid" in cfg:
+        return grid_space(cfg["grid"] or {})
+
+    spec = cfg["random"]
+    return random_space(
+        spec.get("params", {}), spec["n_points"], spec.get("seed")
+    )
+
+
+def apply_point(point: dict, synthesis_spec, constraints, latent_spec):
+    """
+    The (synthesis, constraints, latent) specs with ``point`` applied.
+    """
+    _check_names(point)
+    specs = {
+        "synthesis": synthesis_spec,
+        "constraints": constraints,
+        "latent": latent_spec,
+    }
+    for section in specs:
+        changes = {
+            name: value
+            for name, value in point.items()
+            if SWEEPABLE[name] == section
+        }
+        if changes:
+            if "value_range" in changes:
+                changes["value_range"] = tuple(changes["value_range"])
+            specs[section] = replace(specs[section], **changes)
+
+    return specs["synthesis"], specs["constraints"], specs["latent"]
+
+
+# -----------------------------
+# Results
+# -----------------------------
+
+@dataclass
+class SweepResult:
+    """
+    Evaluation table of a sweep, one row per point.
+
+    Attributes
+    ----------
+    points : list of dict
+        Parameter values of each point, in input order.
+    metrics : dict of str -> np.ndarray
+        Columns of length P, averaged over the samples of a point:
+        ``mean``, ``std``, ``min``, ``max``, ``p10``, ``p50``, ``p90``,
+        ``spatial_correlation`` and one ``area_ratio@<t>`` per threshold.
+    seed_entropy : int
+        Entropy all points drew their sample seeds from.
+    """
+
+    points: list
+    metrics: dict
+    seed_entropy: int
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def to_records(self) -> list[dict]:
+        """
+        One dict of parameters and metrics per point.
+        """
+        names = list(self.metrics)
+        rows = zip(*(self.metrics[name].tolist() for name in names))
+        return [
+            {**point, **dict(zip(names, row))}
+            for point, row in zip(self.points, rows)
+        ]
+
+    def to_frame(self):
+        """
+        ``to_records()`` as a pandas DataFrame indexed by point (needs pandas).
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.to_records(), index=pd.RangeIndex(len(self), name="point")
+        )
+
+
+# -----------------------------
+# Shared-work plan
+# -----------------------------
+
+def _noise_key(spec, latent_spec) -> tuple:
+    # Everything the unit-strength latent field depends on.
+    key = (spec.random_seed, spec.spatial_scale, latent_spec.noise_type)
+    if latent_spec.noise_type == "perlin":
+        key += (latent_spec.octaves, latent_spec.persistence, latent_spec.lacunarity)
+    return key
+
+
+def _sigma(constraints) -> float | None:
+    if not constraints.enforce_spatial_smoothness:
+        return None
+    return constraints.smoothness_kernel_size / constraints.resolution_factor
+
+
+def _field_key(spec, constraints, latent_spec) -> tuple:
+    # Everything the constrained field depends on, past the noise.
+    return (
+        spec.perturbation_strength,
+        latent_spec.normalize,
+        _sigma(constraints),
+        constraints.downhill_weight
+        if constraints.enforce_monotonic_downhill else None,
+        constraints.enforce_bounds,
+    )
+
+
+def plan_sweep(
+    points,
+    synthesis_spec,
+    constraints,
+    latent_spec,
+    n_tasks: int = 1,
+) -> list[tuple]:
+    """
+    Group validated points into tasks that share work.
+
+    Returns a list of tasks ``(noise_key, units)``; each unit is
+    ``(specs, [point indices])`` for points sharing one constrained
+    field. Noise groups are split over several tasks when there are
+    fewer of them than ``n_tasks``.
+    """
+    groups = {}
+    for i, point in enumerate(points):
+        specs = apply_point(point, synthesis_spec, constraints, latent_spec)
+        try:
+            validate_all_flood_specs(*specs)
+        except ValueError as e:
+            raise ValueError(f"Sweep point {i} {point}: {e}") from None
+
+        units = groups.setdefault(_noise_key(specs[0], specs[2]), {})
+        units.setdefault(_field_key(*specs), (specs, []))[1].append(i)
+
+    per_group = max(1, -(-n_tasks // max(len(groups), 1)))
+    tasks = []
+    for key, units in groups.items():
+        units = list(units.values())
+        step = -(-len(units) // min(per_group, len(units)))
+        for start in range(0, len(units), step):
+            tasks.append((key, units[start:start + step]))
+    return tasks
+
+
+# -----------------------------
+# Evaluation of a task
+# -----------------------------
+
+def _smooth(field, sigma):
+    if sigma is None:
+        return field
+    return gaussian_filter(field, sigma=(0,) * (field.ndim - 2) + (sigma, sigma))
+
+
+def _evaluate(risk, thresholds, sigma) -> dict:
+    from geo_augment.evaluation.ensemble import evaluate_ensemble
+
+    ev = evaluate_ensemble(
+        risk, quantiles=(10, 50, 90), thresholds=thresholds, sigma=sigma
+    )
+    row = {name: float(col.mean()) for name, col in ev.stats.items()}
+    for t in thresholds:
+        row[f"area_ratio@{t:g}"] = float(ev.area_ratio(t).mean())
+    return row
+
+
+def _run_task(dem, downhill_bias, seeds, task, specs, options):
+    thresholds, eval_sigma, dtype = options
+    (random_seed, spatial_scale, *_), units = task
+
+    # Unit-strength, unnormalized noise shared by every unit of the task.
+    base = generate_latent_flood_fields(
+        shape=dem.shape,
+        perturbation_strength=1.0,
+        spatial_scale=spatial_scale,
+        seeds=seeds[random_seed],
+        latent_spec=replace(units[0][0][2], normalize=False),
+        dtype=dtype,
+    )
+    lo = base.min(axis=(-2, -1), keepdims=True)
+    hi = base.max(axis=(-2, -1), keepdims=True)
+    smoothed = {}
+
+    rows = {}
+    for (spec, constraints, latent_spec), indices in units:
+        sigma = _sigma(constraints)
+        if sigma not in smoothed:
+            smoothed[sigma] = (
+                _smooth(base, sigma),
+                None if downhill_bias is None else _smooth(downhill_bias, sigma),
+            )
+        base_s, bias_s = smoothed[sigma]
+
+        # latent = s * base, min/max-normalized: an affine map of base.
+        s = spec.perturbation_strength
+        if latent_spec.normalize:
+            scale = s / (s * hi - s * lo + 1e-8)
+            field = scale * base_s - scale * lo
+        else:
+            field = s * base_s
+
+        if constraints.enforce_monotonic_downhill:
+            field = field + constraints.downhill_weight * bias_s
+        if constraints.enforce_bounds:
+            field = np.clip(field, 0.0, 1.0)
+        field = field.astype(dtype, copy=False)
+
+        # One partition of the field serves every percentile.
+        percentiles = sorted({specs[i][0].risk_percentile for i in indices})
+        levels = np.percentile(field, percentiles, axis=(-2, -1), keepdims=True)
+        levels = dict(zip(percentiles, levels))
+
+        for i in indices:
+            point_spec = specs[i][0]
+            risk = np.clip(
+                field / (levels[point_spec.risk_percentile] + 1e-8),
+                *point_spec.value_range,
+            ).astype(dtype, copy=False)
+            rows[i] = _evaluate(risk, thresholds, eval_sigma)
+
+    return rows
+
+
+_WORKER = {}
+
+
+def _init_worker(dem, downhill_bias, seeds, specs, options):
+    set_default_dtype(options[2])
+    _WORKER.clear()
+    _WORKER.update(
+        dem=dem,
+        downhill_bias=downhill_bias,
+        seeds=seeds,
+        specs=specs,
+        options=options,
+    )
+
+
+def _run_worker_task(task):
+    w = _WORKER
+    return _run_task(
+        w["dem"], w["downhill_bias"], w["seeds"], task, w["specs"],
+        w["options"],
+    )
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+@profiled("floods.sweep")
+def sweep_flood_specs(
+    dem: np.ndarray,
+    points: list[dict],
+    synthesis_spec: FloodSynthesisSpec,
+    constraints: FloodConstraints,
+    latent_spec: LatentFloodFieldSpec,
+    n_samples: int = 1,
+    thresholds=DEFAULT_THRESHOLDS,
+    eval_sigma: float = 5.0,
+    workers: int | None = None,
+    dtype=None,
+) -> SweepResult:
+    """
+    Evaluate every point of a parameter sweep on one DEM.
+
+    Parameters
+    ----------
+    dem : np.ndarray
+        Elevation raster.
+    points : list of dict
+        Spec overrides, e.g. from ``grid_space`` or ``random_space``.
+    synthesis_spec, constraints, latent_spec
+        Base specs the points override.
+    n_samples : int
+        Samples per point; metrics are averaged over them.
+    thresholds : sequence of float
+        Risk thresholds of the ``area_ratio@<t>`` metrics.
+    eval_sigma : float
+        Smoothing strength of the spatial correlation metric.
+    workers : optional int
+        Processes for groups of points (0 = all cores; default: in-process).
+
+    Returns
+    -------
+    SweepResult
+    """
+    if n_samples <= 0:
+        raise ValueError("n_samples must be >= 1")
+    if not points:
+        raise ValueError("A sweep needs at least one point")
+
+    dtype = resolve_dtype(dtype)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    workers = workers or 1
+
+    # Unseeded sweeps still share one set of seeds across all points.
+    entropy = synthesis_spec.random_seed
+    if entropy is None:
+        entropy = int(np.random.SeedSequence().entropy)
+    synthesis_spec = replace(synthesis_spec, random_seed=entropy)
+    seeded = [
+        {**p, "random_seed": entropy}
+        if "random_seed" in p and p["random_seed"] is None else p
+        for p in points
+    ]
+
+    tasks = plan_sweep(seeded, synthesis_spec, constraints, latent_spec, workers)
+    specs = [
+        apply_point(p, synthesis_spec, constraints, latent_spec) for p in seeded
+    ]
+    seeds = {
+        seed: spawn_sample_seeds(seed, n_samples)
+        for seed in {spec.random_seed for spec, _, _ in specs}
+    }
+
+    downhill_bias = None
+    if any(c.enforce_monotonic_downhill for _, c, _ in specs):
+        downhill_bias = compute_downhill_bias(dem, dtype=dtype)
+
+    thresholds = tuple(float(t) for t in thresholds)
+    options = (thresholds, eval_sigma, dtype)
+    rows = {}
+
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            rows.update(
+                _run_task(dem, downhill_bias, seeds, task, specs, options)
+            )
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(dem, downhill_bias, seeds, specs, options),
+        ) as pool:
+            for result in pool.map(_run_worker_task, tasks):
+                rows.update(result)
+
+    names = list(rows[0])
+    metrics = {
+        name: np.array([rows[i][name] for i in range(len(points))])
+        for name in names
+    }
+    return SweepResult(
+        points=list(points), metrics=metrics, seed_entropy=entropy
+    )
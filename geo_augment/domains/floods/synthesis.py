@@ -1,6 +1,10 @@
+from dataclasses import dataclass
+
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
+from geo_augment.core.precision import resolve_dtype
+
 
 def generate_spatial_noise(
     shape: tuple,
@@ -45,6 +49,27 @@ def perturb_flood_risk(
 
 
 # Constraint validation
+def validate_flood_risk_batch(
+    original: np.ndarray,
+    synthetic: np.ndarray,
+    max_mean_shift: float = 0.1,
+    max_pixel_change: float = 0.3
+) -> np.ndarray:
+    """
+    Vectorized ``validate_flood_risk`` over a (K, H, W) candidate batch.
+
+    Returns
+    -------
+    np.ndarray
+        Shape: (K,), True where the candidate is plausible.
+    """
+
+    mean_shift = np.abs(synthetic.mean(axis=(-2, -1)) - original.mean())
+    max_change = np.abs(synthetic - original).max(axis=(-2, -1))
+
+    return (mean_shift <= max_mean_shift) & (max_change <= max_pixel_change)
+
+
 def validate_flood_risk(
     original: np.ndarray,
     synthetic: np.ndarray,
@@ -67,7 +92,148 @@ def validate_flood_risk(
     return True
 
 
-# Rejection Sampling wrapper
+@dataclass
+class SamplingStats:
+    """
+    Acceptance statistics of ``sample_synthetic_flood_risk``.
+    """
+
+    n_accepted: int = 0
+    n_candidates: int = 0
+    n_batches: int = 0
+
+    @property
+    def acceptance_rate(self) -> float:
+        if self.n_candidates == 0:
+            return 0.0
+        return self.n_accepted / self.n_candidates
+
+
+# Memory allowed for one candidate batch. Each candidate costs four
+# (H, W) rasters: noise, the copy ``gaussian_filter`` returns and the
+# two temporaries of the pixel-change check.
+DEFAULT_MAX_BATCH_BYTES = 512 * 2**20
+
+
+def _next_batch_size(stats, remaining, batch_size, max_batch_size):
+    if stats.n_candidates == 0:
+        return min(batch_size, remaining, max_batch_size)
+
+    # Laplace-smoothed rate, so a batch with no acceptances still grows K.
+    rate = (stats.n_accepted + 1) / (stats.n_candidates + 2)
+    wanted = int(np.ceil(1.25 * remaining / rate))
+    return int(np.clip(wanted, 1, max_batch_size))
+
+
+# Rejection Sampling
+def sample_synthetic_flood_risk(
+    risk: np.ndarray,
+    slope: np.ndarray,
+    n_samples: int,
+    max_candidates: int = 1000,
+    batch_size: int = 8,
+    max_batch_size: int = 64,
+    max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_delta: float = 0.15,
+    smooth_sigma: float = 2.0,
+    max_mean_shift: float = 0.1,
+    max_pixel_change: float = 0.3,
+    seed=None,
+    dtype=None,
+) -> tuple[np.ndarray, SamplingStats]:
+    """
+    Draw ``n_samples`` valid perturbations of ``risk`` by batched rejection.
+
+    Candidates are generated and validated as (K, H, W) batches. The
+    first batch holds ``min(batch_size, n_samples)`` candidates; after
+    each batch, K is resized from the observed acceptance rate to cover
+    the remaining samples in about one more batch, capped at
+    ``max_batch_size`` and at ``max_batch_bytes`` of working memory.
+    Candidates use consecutive draws of one generator, so the accepted
+    samples do not depend on K.
+
+    Parameters
+    ----------
+    max_candidates : int
+        Give up after generating this many candidates.
+    max_batch_bytes : int
+        Memory budget of one batch (noise, filtered copy and
+        validation temporaries); K is reduced to fit, down to one
+        candidate.
+    seed : optional
+        Anything ``np.random.default_rng`` accepts; global state is
+        untouched.
+
+    Returns
+    -------
+    samples : np.ndarray
+        Shape: (n_samples, H, W), in candidate order.
+    stats : SamplingStats
+
+    Raises
+    ------
+    RuntimeError
+        If fewer than ``n_samples`` candidates were accepted within
+        ``max_candidates``.
+    """
+
+    if n_samples <= 0:
+        raise ValueError("n_samples must be >= 1")
+
+    if batch_size <= 0 or max_batch_size <= 0:
+        raise ValueError("batch sizes must be >= 1")
+
+    if max_batch_bytes <= 0:
+        raise ValueError("max_batch_bytes must be > 0")
+
+    dtype = resolve_dtype(dtype)
+    rng = np.random.default_rng(seed)
+
+    risk = risk.astype(dtype, copy=False)
+    damping = (1.0 - slope).astype(dtype, copy=False)
+
+    samples = np.empty((n_samples,) + risk.shape, dtype=dtype)
+    stats = SamplingStats()
+
+    per_candidate = 4 * risk.size * dtype.itemsize
+    max_batch_size = max(1, min(max_batch_size, max_batch_bytes // per_candidate))
+
+    while stats.n_accepted < n_samples:
+        remaining = n_samples - stats.n_accepted
+        k = min(
+            _next_batch_size(stats, remaining, batch_size, max_batch_size),
+            max_candidates - stats.n_candidates,
+        )
+        if k <= 0:
+            raise RuntimeError(
+                "Failed to generate valid synthetic flood risk: "
+                f"{stats.n_accepted}/{n_samples} accepted after "
+                f"{stats.n_candidates} candidates."
+            )
+
+        noise = rng.standard_normal((k,) + risk.shape, dtype=dtype)
+        noise *= max_delta
+        noise = gaussian_filter(noise, sigma=(0, smooth_sigma, smooth_sigma))
+
+        # Same arithmetic as ``perturb_flood_risk``, done in place.
+        candidates = noise
+        candidates *= damping
+        candidates += risk
+        np.clip(candidates, 0.0, 1.0, out=candidates)
+
+        valid = validate_flood_risk_batch(
+            risk, candidates, max_mean_shift, max_pixel_change
+        )
+        accepted = candidates[valid][:remaining]
+
+        samples[stats.n_accepted:stats.n_accepted + len(accepted)] = accepted
+        stats.n_accepted += len(accepted)
+        stats.n_candidates += k
+        stats.n_batches += 1
+
+    return samples, stats
+
+
 def generate_synthetic_flood_risk(
     risk: np.ndarray,
     slope: np.ndarray,
@@ -76,16 +242,17 @@ def generate_synthetic_flood_risk(
 ) -> np.ndarray:
     """
     Generate one valid synthetic flood risk sample.
-    """
 
-    for _ in range(attempts):
-        candidate = perturb_flood_risk(
-            risk=risk,
-            slope=slope,
-            **kwargs
-        )
+    Thin wrapper over ``sample_synthetic_flood_risk`` with
+    ``n_samples=1`` and ``max_candidates=attempts``.
+    """
 
-        if validate_flood_risk(risk, candidate):
-            return candidate
+    samples, _ = sample_synthetic_flood_risk(
+        risk=risk,
+        slope=slope,
+        n_samples=1,
+        max_candidates=attempts,
+        **kwargs
+    )
 
-    raise RuntimeError("Failed to generate valid synthetic flood risk.")
+    return samples[0]
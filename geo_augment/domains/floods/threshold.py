@@ -1,5 +1,7 @@
 import numpy as np
 
+from geo_augment.core.quantiles import HistogramSketch
+
 
 def apply_threshold(
     risk: np.ndarray,
@@ -25,7 +27,8 @@ def apply_threshold(
 # Percentile-based thresholding - data-scarce regions
 def apply_percentile_threshold(
     risk: np.ndarray,
-    percentile: float = 90.0
+    percentile: float = 90.0,
+    sketch: HistogramSketch | None = None
 ) -> np.ndarray:
     """
     Threshold flood risk using percentile-based cutoff.
@@ -36,11 +39,16 @@ def apply_percentile_threshold(
         Flood risk surface
     percentile : float
         Percentile (0–100)
+    sketch : HistogramSketch, optional
+        Sketch of the full surface when ``risk`` is one block of it
 
     Returns
     -------
     binary : np.ndarray
         Binary flood mask
     """
-    cutoff = np.percentile(risk, percentile)
+    if sketch is not None:
+        cutoff = sketch.percentile(percentile)
+    else:
+        cutoff = np.percentile(risk, percentile)
     return (risk >= cutoff).astype(np.uint8)
@@ -68,6 +68,11 @@ def validate_flood_constraints(constraints: FloodConstraints) -> None:
             "downhill_weight must be >= 0"
         )
 
+    if constraints.resolution_factor <= 0:
+        raise FloodSpecValidationError(
+            "resolution_factor must be > 0"
+        )
+
     if (
         constraints.enforce_spatial_smoothness
         and constraints.smoothness_kernel_size < 3
@@ -88,6 +93,14 @@ def validate_latent_field_spec(spec: LatentFloodFieldSpec) -> None:
             f"Allowed values: {sorted(allowed_noise_types)}"
         )
 
+    if spec.octaves < 1:
+        raise FloodSpecValidationError("octaves must be >= 1")
+
+    _validate_range("persistence", spec.persistence, (0.0, 1.0))
+
+    if spec.lacunarity < 1.0:
+        raise FloodSpecValidationError("lacunarity must be >= 1")
+
 
 def validate_all_flood_specs(
     synthesis: FloodSynthesisSpec,
@@ -1,11 +1,17 @@
 import numpy as np
 
+from geo_augment.core.quantiles import HistogramSketch
+
 
 def calibrate_road_connectivity(
     field,
     percentile,
     value_range,
+    sketch: HistogramSketch | None = None,
 ):
-    p = np.percentile(field, percentile)
+    if sketch is not None:
+        p = sketch.percentile(percentile)
+    else:
+        p = np.percentile(field, percentile)
     field = field / (p + 1e-8)
     return np.clip(field, *value_range)
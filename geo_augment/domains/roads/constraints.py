@@ -12,12 +12,13 @@ def apply_road_constraints(
     score = latent_field
 
     if constraints.enforce_linearity:
-        score *= flatness
+        score = score * flatness
 
     if constraints.enforce_smoothness:
         score = gaussian_filter(
             score,
-            sigma=constraints.smoothness_kernel_size,
+            sigma=constraints.smoothness_kernel_size
+            / constraints.resolution_factor,
         )
 
     return np.clip(score, 0.0, 1.0)
@@ -1,5 +1,8 @@
 import numpy as np
 from scipy.ndimage import sobel
+from geo_augment.core.cache import FeatureCache
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.profiling import profiled
 from geo_augment.io.preprocess import prepare_dem, normalize_minmax
 
 
@@ -9,10 +12,25 @@ def compute_gradient_magnitude(dem):
     return np.hypot(dx, dy)
 
 
-def stack_road_features(dem: np.ndarray) -> np.ndarray:
-    dem = prepare_dem(dem)
+@profiled("roads.features")
+def stack_road_features(
+    dem: np.ndarray,
+    cache: FeatureCache | None = None,
+    dtype=None,
+) -> np.ndarray:
+    dtype = resolve_dtype(dtype)
 
-    gradient = normalize_minmax(compute_gradient_magnitude(dem))
+    if cache is not None:
+        return cache.get_or_compute(
+            "road_features",
+            dem,
+            {"dtype": dtype.name},
+            lambda: stack_road_features(dem, dtype=dtype),
+        )
+
+    dem = prepare_dem(dem, dtype=dtype)
+
+    gradient = normalize_minmax(compute_gradient_magnitude(dem), dtype=dtype)
     flatness = 1.0 - gradient
 
     return np.stack([dem, gradient, flatness], axis=0)
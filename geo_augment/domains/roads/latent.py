@@ -1,6 +1,10 @@
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
+from geo_augment.core.perlin import perlin_noise
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.spectral import spectral_gaussian_filter
+
 
 def generate_latent_road_field(
     shape,
@@ -8,12 +12,33 @@ def generate_latent_road_field(
     spatial_scale,
     seed,
     latent_spec,
+    dtype=None,
 ):
-    rng = np.random.default_rng(seed)
+    """
+    Generate a latent road connectivity potential field.
 
-    noise = rng.standard_normal(shape)
+    Noise is drawn in float64 and stored in ``dtype`` (default: the
+    precision policy) before filtering, so float32 fields see the same
+    random values as float64 ones.
+    """
+    dtype = resolve_dtype(dtype)
+    rng = np.random.default_rng(seed)
 
-    field = gaussian_filter(noise, sigma=spatial_scale)
+    if latent_spec.noise_type == "perlin":
+        field = perlin_noise(
+            shape,
+            scale=spatial_scale,
+            seed=rng.integers(2**63),
+            octaves=latent_spec.octaves,
+            persistence=latent_spec.persistence,
+            lacunarity=latent_spec.lacunarity,
+        ).astype(dtype, copy=False)
+    elif latent_spec.noise_type == "spectral":
+        noise = rng.standard_normal(shape).astype(dtype, copy=False)
+        field = spectral_gaussian_filter(noise, spatial_scale)
+    else:
+        noise = rng.standard_normal(shape).astype(dtype, copy=False)
+        field = gaussian_filter(noise, sigma=spatial_scale)
     field *= perturbation_strength
 
     if latent_spec.normalize:
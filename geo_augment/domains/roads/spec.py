@@ -20,6 +20,8 @@ class RoadConstraints:
 
     smoothness_kernel_size: int = 5
     continuity_weight: float = 1.0
+    # Smoothing sigma is smoothness_kernel_size / resolution_factor.
+    resolution_factor: float = 1.0
 
 
 @dataclass(frozen=True)
@@ -27,6 +29,9 @@ class LatentRoadFieldSpec:
     noise_type: str = "spectral"
     normalize: bool = True
     apply_directional_bias: bool = True
+    octaves: int = 4
+    persistence: float = 0.5
+    lacunarity: float = 2.0
 
 
 DEFAULT_ROAD_SPEC = RoadSynthesisSpec(
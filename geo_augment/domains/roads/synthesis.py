@@ -9,6 +9,7 @@ def generate_synthetic_road_connectivity(
     constraints,
     latent_spec,
     seed,
+    dtype=None,
 ):
     latent = generate_latent_road_field(
         shape=features.shape[1:],
@@ -16,6 +17,7 @@ def generate_synthetic_road_connectivity(
         spatial_scale=synthesis_spec.spatial_scale,
         seed=seed,
         latent_spec=latent_spec,
+        dtype=dtype,
     )
 
     constrained = apply_road_constraints(
@@ -7,3 +7,6 @@ def validate_road_specs(synthesis, constraints, latent):
 
     if not (0 < synthesis.connectivity_percentile < 100):
         raise ValueError("connectivity_percentile must be in (0,100)")
+
+    if constraints.resolution_factor <= 0:
+        raise ValueError("resolution_factor must be positive")
@@ -1,5 +1,10 @@
 import numpy as np
 
+from geo_augment.core.cache import FeatureCache
+from geo_augment.core.memo import StageCache, array_key, chain_key, latent_key
+from geo_augment.core.parallel import run_sample_pool, spawn_sample_seeds
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.profiling import profiled
 from geo_augment.domains.urban.spec import (
     UrbanSynthesisSpec,
     UrbanConstraints,
@@ -7,39 +12,144 @@ from geo_augment.domains.urban.spec import (
 )
 from geo_augment.domains.urban.validation import validate_urban_specs
 from geo_augment.domains.urban.features import stack_urban_features
+from geo_augment.domains.urban.latent import generate_latent_urban_field
+from geo_augment.domains.urban.constraints import apply_urban_constraints
+from geo_augment.domains.urban.calibration import calibrate_urban_density
 from geo_augment.domains.urban.synthesis import generate_synthetic_urban_density
 from geo_augment.domains.urban.threshold import threshold_urban_density
 
 
+def _urban_kernel(arrays, context, seeds):
+    synthesis_spec, constraints, latent_spec = context
+    features = arrays["features"]
+
+    outputs = np.empty((len(seeds),) + features.shape[1:], dtype=features.dtype)
+
+    for i, seed in enumerate(seeds):
+        outputs[i] = generate_synthetic_urban_density(
+            features,
+            synthesis_spec,
+            constraints,
+            latent_spec,
+            seed,
+            dtype=features.dtype,
+        )
+
+    return outputs
+
+
+def _synthesize_memoized(
+    dem, n_samples, synthesis_spec, constraints, latent_spec, memo, cache, dtype
+):
+    # Stage by stage as in generate_synthetic_urban_density, each keyed
+    # on the spec fields and upstream stages it depends on.
+    dtype = resolve_dtype(dtype)
+    dem_key = array_key(dem)
+    features = memo.get_or_compute(
+        "urban.features",
+        (dem_key, dtype.str),
+        lambda: stack_urban_features(dem, cache=cache, dtype=dtype),
+    )
+    shape = features.shape[1:]
+    seeds = spawn_sample_seeds(synthesis_spec.random_seed, n_samples)
+
+    latent_k = latent_key(
+        shape, synthesis_spec, latent_spec, n_samples, dtype
+    )
+    latent = memo.get_or_compute(
+        "urban.latent",
+        latent_k,
+        lambda: np.stack([
+            generate_latent_urban_field(
+                shape,
+                synthesis_spec.perturbation_strength,
+                synthesis_spec.spatial_scale,
+                seed,
+                latent_spec,
+                dtype=dtype,
+            )
+            for seed in seeds
+        ]),
+    )
+
+    sigma = None
+    if constraints.enforce_compactness:
+        sigma = constraints.smoothness_kernel_size / constraints.resolution_factor
+    constraint_params = (sigma,)
+    if constraints.enforce_density_bias:
+        constraint_params += (dem_key, dtype.str)
+
+    constrained_k = chain_key(latent_k, *constraint_params)
+    constrained = memo.get_or_compute(
+        "urban.constraints",
+        constrained_k,
+        lambda: np.stack([
+            apply_urban_constraints(field, features, constraints)
+            for field in latent
+        ]),
+    )
+
+    density = memo.get_or_compute(
+        "urban.calibration",
+        chain_key(
+            constrained_k,
+            synthesis_spec.density_percentile,
+            tuple(synthesis_spec.value_range),
+            dtype.str,
+        ),
+        lambda: np.stack([
+            calibrate_urban_density(
+                field,
+                synthesis_spec.density_percentile,
+                synthesis_spec.value_range,
+            )
+            for field in constrained
+        ]).astype(features.dtype, copy=False),
+    )
+
+    # Cached outputs are read-only; callers get their own copy.
+    return density if density.flags.writeable else density.copy()
+
+
+@profiled("urban.synthesis")
 def synthesize_urban_morphology(
     dem: np.ndarray,
     synthesis_spec: UrbanSynthesisSpec,
     constraints: UrbanConstraints,
     latent_spec: LatentUrbanFieldSpec,
     n_samples: int = 1,
+    workers: int | None = None,
+    cache: FeatureCache | None = None,
+    dtype=None,
+    memo: StageCache | None = None,
 ):
-    validate_urban_specs(synthesis_spec, constraints, latent_spec)
+    """
+    Generate (n_samples, H, W) synthetic density surfaces.
 
-    features = stack_urban_features(dem)
-    outputs = []
+    With ``memo``, the feature, latent, constraint and calibration
+    stages are memoized across calls and only the stages a spec change
+    invalidates are rerun (in-process; ``workers`` is ignored).
+    """
+    validate_urban_specs(synthesis_spec, constraints, latent_spec)
 
-    for i in range(n_samples):
-        seed = (
-            None if synthesis_spec.random_seed is None
-            else synthesis_spec.random_seed + i
+    if memo is not None:
+        return _synthesize_memoized(
+            dem, n_samples, synthesis_spec, constraints, latent_spec,
+            memo, cache, dtype,
         )
 
-        outputs.append(
-            generate_synthetic_urban_density(
-                features,
-                synthesis_spec,
-                constraints,
-                latent_spec,
-                seed,
-            )
-        )
+    features = stack_urban_features(dem, cache=cache, dtype=dtype)
+    seeds = spawn_sample_seeds(synthesis_spec.random_seed, n_samples)
 
-    return outputs
+    return run_sample_pool(
+        _urban_kernel,
+        inputs={"features": features},
+        context=(synthesis_spec, constraints, latent_spec),
+        seeds=seeds,
+        sample_shape=features.shape[1:],
+        workers=workers,
+        dtype=features.dtype,
+    )
 
 
 def synthesize_urban_labels(
@@ -1,5 +1,8 @@
 import numpy as np
 from scipy.ndimage import sobel
+from geo_augment.core.cache import FeatureCache
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.profiling import profiled
 from geo_augment.io.preprocess import prepare_dem, normalize_minmax
 
 
@@ -9,10 +12,25 @@ def compute_edge_density(dem):
     return np.hypot(dx, dy)
 
 
-def stack_urban_features(dem: np.ndarray) -> np.ndarray:
-    dem = prepare_dem(dem)
+@profiled("urban.features")
+def stack_urban_features(
+    dem: np.ndarray,
+    cache: FeatureCache | None = None,
+    dtype=None,
+) -> np.ndarray:
+    dtype = resolve_dtype(dtype)
 
-    edge_density = normalize_minmax(compute_edge_density(dem))
+    if cache is not None:
+        return cache.get_or_compute(
+            "urban_features",
+            dem,
+            {"dtype": dtype.name},
+            lambda: stack_urban_features(dem, dtype=dtype),
+        )
+
+    dem = prepare_dem(dem, dtype=dtype)
+
+    edge_density = normalize_minmax(compute_edge_density(dem), dtype=dtype)
     flatness = 1.0 - edge_density
 
     return np.stack([dem, edge_density, flatness], axis=0)
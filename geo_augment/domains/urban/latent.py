@@ -1,6 +1,10 @@
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
+from geo_augment.core.perlin import perlin_noise
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.spectral import spectral_gaussian_filter
+
 
 def generate_latent_urban_field(
     shape,
@@ -8,11 +12,33 @@ def generate_latent_urban_field(
     spatial_scale,
     seed,
     latent_spec,
+    dtype=None,
 ):
+    """
+    Generate a latent urban density potential field.
+
+    Noise is drawn in float64 and stored in ``dtype`` (default: the
+    precision policy) before filtering, so float32 fields see the same
+    random values as float64 ones.
+    """
+    dtype = resolve_dtype(dtype)
     rng = np.random.default_rng(seed)
 
-    noise = rng.standard_normal(shape)
-    field = gaussian_filter(noise, sigma=spatial_scale)
+    if latent_spec.noise_type == "perlin":
+        field = perlin_noise(
+            shape,
+            scale=spatial_scale,
+            seed=rng.integers(2**63),
+            octaves=latent_spec.octaves,
+            persistence=latent_spec.persistence,
+            lacunarity=latent_spec.lacunarity,
+        ).astype(dtype, copy=False)
+    elif latent_spec.noise_type == "spectral":
+        noise = rng.standard_normal(shape).astype(dtype, copy=False)
+        field = spectral_gaussian_filter(noise, spatial_scale)
+    else:
+        noise = rng.standard_normal(shape).astype(dtype, copy=False)
+        field = gaussian_filter(noise, sigma=spatial_scale)
 
     field *= perturbation_strength
 
@@ -20,6 +20,8 @@ class UrbanConstraints:
 
     smoothness_kernel_size: int = 7
     density_weight: float = 1.0
+    # Smoothing sigma is smoothness_kernel_size / resolution_factor.
+    resolution_factor: float = 1.0
 
 
 @dataclass(frozen=True)
@@ -27,6 +29,9 @@ class LatentUrbanFieldSpec:
     noise_type: str = "spectral"
     normalize: bool = True
     apply_grid_bias: bool = True
+    octaves: int = 4
+    persistence: float = 0.5
+    lacunarity: float = 2.0
 
 
 DEFAULT_URBAN_SPEC = UrbanSynthesisSpec(
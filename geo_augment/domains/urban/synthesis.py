@@ -9,6 +9,7 @@ def generate_synthetic_urban_density(
     constraints,
     latent_spec,
     seed,
+    dtype=None,
 ):
     latent = generate_latent_urban_field(
         shape=features.shape[1:],
@@ -16,6 +17,7 @@ def generate_synthetic_urban_density(
         spatial_scale=synthesis_spec.spatial_scale,
         seed=seed,
         latent_spec=latent_spec,
+        dtype=dtype,
     )
 
     constrained = apply_urban_constraints(
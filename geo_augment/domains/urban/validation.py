@@ -7,3 +7,6 @@ def validate_urban_specs(synthesis, constraints, latent):
 
     if not (0 < synthesis.density_percentile < 100):
         raise ValueError("density_percentile must be in (0,100)")
+
+    if constraints.resolution_factor <= 0:
+        raise ValueError("resolution_factor must be positive")
@@ -1,7 +1,22 @@
-from .floods import (
-    distribution_summary,
-    spatial_correlation,
-    flooded_area_ratio,
-)
+# Imported on first access: the metrics depend on scipy.ndimage.
 
+_EXPORTS = {
+    "distribution_summary": "floods",
+    "spatial_correlation": "floods",
+    "flooded_area_ratio": "floods",
+    "evaluate_ensemble": "ensemble",
+    "EnsembleEvaluation": "ensemble",
+    "spatial_structure": "spectral",
+    "compare_spatial_structure": "spectral",
+    "SpatialStructure": "spectral",
+}
 
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        module = import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,14 +5,16 @@ def summarize_distribution(arr: np.ndarray) -> dict:
     """
     Compute basic distribution statistics for a flood-risk surface.
     """
+    p5, p50, p95 = np.percentile(arr, [5, 50, 95])
+
     return {
         "min": float(np.min(arr)),
         "max": float(np.max(arr)),
         "mean": float(np.mean(arr)),
         "std": float(np.std(arr)),
-        "p5": float(np.percentile(arr, 5)),
-        "p50": float(np.percentile(arr, 50)),
-        "p95": float(np.percentile(arr, 95)),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
     }
 
 
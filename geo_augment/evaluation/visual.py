@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 
@@ -10,6 +9,8 @@ def plot_risk_surface(
     """
     Visualize a single flood-risk surface.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(6, 6))
     plt.imshow(surface, cmap=cmap)
     plt.colorbar(label="Flood Risk")
@@ -26,6 +27,8 @@ def compare_risk_surfaces(
     """
     Side-by-side comparison of reference vs synthetic flood risk.
     """
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(1, 2, figsize=(10, 5))
 
     im0 = axes[0].imshow(reference, cmap="viridis")
@@ -1,17 +1,43 @@
 import numpy as np
 
+from geo_augment.core.precision import resolve_dtype
+
+
+def masked_to_nan(arr: np.ndarray, dtype=None) -> np.ndarray:
+    """
+    Plain ndarray with masked cells set to NaN.
+
+    Arithmetic on masked arrays promotes float32 to float64 when mixed
+    with Python scalars, so DEMs from ``RasterLoader.read()`` are
+    unwrapped before any computation. Plain arrays pass through
+    unchanged; masked ones are cast to ``dtype`` (default: their own
+    float dtype, or the precision policy for integer rasters).
+    """
+    if not np.ma.isMaskedArray(arr):
+        return arr
+
+    if dtype is None:
+        dtype = arr.dtype if arr.dtype.kind == "f" else resolve_dtype(None)
+    return np.ma.filled(arr.astype(dtype, copy=False), np.nan)
+
 
 def fill_nodata(
     arr: np.ndarray,
-    nodata_value=None
+    nodata_value=None,
+    dtype=None
 ) -> np.ndarray:
     """
     Replace nodata values with local mean.
+
+    The result is a new array in ``dtype`` (default: the precision
+    policy, see ``geo_augment.core.precision``).
     """
-    data = arr.astype(float)
+    dtype = resolve_dtype(dtype)
+    arr = masked_to_nan(arr, dtype=dtype)
+    data = arr.astype(dtype)
 
     if nodata_value is not None:
-        data[data == nodata_value] = np.nan
+        data[arr == nodata_value] = np.nan
 
     mask = np.isnan(data)
     if mask.any():
@@ -21,11 +47,11 @@ def fill_nodata(
     return data
 
 
-def normalize_minmax(arr: np.ndarray) -> np.ndarray:
+def normalize_minmax(arr: np.ndarray, dtype=None) -> np.ndarray:
     """
     Min–max normalization to [0, 1].
     """
-    arr = arr.astype(float)
+    arr = arr.astype(resolve_dtype(dtype), copy=False)
     min_val = np.nanmin(arr)
     max_val = np.nanmax(arr)
 
@@ -35,10 +61,10 @@ def normalize_minmax(arr: np.ndarray) -> np.ndarray:
     return (arr - min_val) / (max_val - min_val)
 
 
-def prepare_dem(dem: np.ndarray) -> np.ndarray:
+def prepare_dem(dem: np.ndarray, dtype=None) -> np.ndarray:
     """
     Full DEM preprocessing pipeline.
     """
-    dem = fill_nodata(dem)
-    dem = normalize_minmax(dem)
+    dem = fill_nodata(dem, dtype=dtype)
+    dem = normalize_minmax(dem, dtype=dtype)
     return dem
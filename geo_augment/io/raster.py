@@ -1,41 +1,388 @@
-import rasterio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from rasterio.windows import Window
+
+from geo_augment.core.profiling import stage
+
+
+def _rasterio():
+    # Deferred: importing rasterio (GDAL) costs more than most callers
+    # of this module need before their first read.
+    import rasterio
+    return rasterio
+
+
+# Decoded blocks kept per loader.
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+# Native blocks are grouped into cache tiles of at least this many rows
+# and columns, so striped (one-row-block) files are not read row by row.
+MIN_TILE_SIDE = 256
+
+
+def _block_nbytes(block: np.ma.MaskedArray) -> int:
+    mask = np.ma.getmask(block)
+    return block.data.nbytes + (0 if mask is np.ma.nomask else mask.nbytes)
+
+
+class BlockCache:
+    """
+    Thread-safe LRU of decoded raster tiles, bounded in bytes.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def get(self, key):
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+    def put(self, key, block: np.ma.MaskedArray):
+        size = _block_nbytes(block)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._blocks:
+                return
+            self._blocks[key] = block
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self.nbytes -= _block_nbytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self.nbytes = 0
 
 
 class RasterLoader:
     """
     Safe raster reader for single-band geospatial rasters (e.g. DEM).
+
+    Dataset handles stay open between calls: one per thread (rasterio
+    datasets are not thread-safe), reopened after a fork. Window reads
+    are served from tiles aligned to the file's internal block layout,
+    decoded once and kept in a byte-bounded LRU shared by all threads.
+    Parallel ``read_windows`` calls share one thread pool per loader, so
+    the number of open handles stays bounded. Call ``close()``, or use
+    the loader as a context manager, to release the pool and handles.
+
+    Parameters
+    ----------
+    path : str
+        Raster path or URL understood by rasterio.
+    cache_bytes : int
+        Budget of the decoded-tile cache (0 disables caching).
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, cache_bytes: int = DEFAULT_CACHE_BYTES):
         self.path = path
+        self.cache_bytes = cache_bytes
+        self.cache = BlockCache(cache_bytes)
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_key = None
+        self._info = None
+
+    # -----------------------------
+    # Handles
+    # -----------------------------
+
+    def _dataset(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.pid = os.getpid()
+            local.src = None
+
+        if local.src is None or local.src.closed:
+            local.src = _rasterio().open(self.path)
+            with self._lock:
+                # Handles of threads that have exited can no longer be used.
+                live = []
+                for owner, thread, src in self._handles:
+                    if owner == local.pid and not thread.is_alive():
+                        src.close()
+                    else:
+                        live.append((owner, thread, src))
+                live.append((local.pid, threading.current_thread(), local.src))
+                self._handles = live
+
+        return local.src
 
-    def read(self, masked: bool = True) -> np.ndarray:
+    def _executor(self, workers: int) -> ThreadPoolExecutor:
+        key = (os.getpid(), workers)
+        stale = None
+        with self._lock:
+            if self._pool_key != key:
+                # A pool inherited through fork has no threads to shut down.
+                if self._pool is not None and self._pool_key[0] == key[0]:
+                    stale = self._pool
+                self._pool = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="geoaugment-raster",
+                )
+                self._pool_key = key
+            pool = self._pool
+
+        # Outside the lock: exiting workers may still be opening handles.
+        if stale is not None:
+            stale.shutdown(wait=True)
+        return pool
+
+    def close(self):
         """
-        Read full raster into memory.
+        Shut down the read pool, close every handle this process opened
+        and drop cached tiles.
         """
-        with rasterio.open(self.path) as src:
-            data = src.read(1, masked=masked)
-        return data
+        pid = os.getpid()
+        with self._lock:
+            pool, self._pool, self._pool_key = self._pool, None, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for owner, _, src in handles:
+            if owner == pid:
+                src.close()
+        self.cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __getstate__(self):
+        # Handles, the read pool and decoded tiles stay with the process
+        # that made them.
+        return {"path": self.path, "cache_bytes": self.cache_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["cache_bytes"])
+
+    # -----------------------------
+    # Layout
+    # -----------------------------
+
+    def _layout(self) -> dict:
+        if self._info is None:
+            src = self._dataset()
+            block_h, block_w = src.block_shapes[0]
+            self._info = {
+                "meta": src.meta.copy(),
+                "block_shape": (block_h, block_w),
+                "tile_shape": (
+                    block_h * -(-MIN_TILE_SIDE // block_h),
+                    block_w * -(-MIN_TILE_SIDE // block_w),
+                ),
+            }
+        return self._info
 
     def metadata(self) -> dict:
         """
         Return raster metadata.
         """
-        with rasterio.open(self.path) as src:
-            return src.meta.copy()
+        return self._layout()["meta"].copy()
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Raster shape as (height, width).
+        """
+        meta = self._layout()["meta"]
+        return meta["height"], meta["width"]
+
+    @property
+    def block_shape(self) -> tuple[int, int]:
+        """
+        Native (height, width) block shape of band 1.
+        """
+        return self._layout()["block_shape"]
+
+    @property
+    def tile_shape(self) -> tuple[int, int]:
+        """
+        Shape of the cached tiles: a whole number of native blocks.
+        """
+        return self._layout()["tile_shape"]
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+
+    @property
+    def overview_factors(self) -> list[int]:
+        """
+        Decimation factors of the file's internal overviews of band 1.
+        """
+        return self._dataset().overviews(1)
+
+    def read(
+        self,
+        masked: bool = True,
+        out_shape: tuple[int, int] | None = None,
+        resampling: str = "average",
+    ) -> np.ndarray:
+        """
+        Read full raster into memory.
+
+        With ``out_shape`` the raster is read decimated to that shape:
+        GDAL serves it from the closest internal overview when the file
+        has one, and resamples with ``resampling`` (a
+        ``rasterio.enums.Resampling`` name) otherwise.
+        """
+        kwargs = {}
+        if out_shape is not None:
+            from rasterio.enums import Resampling
+
+            kwargs = {
+                "out_shape": tuple(out_shape),
+                "resampling": Resampling[resampling],
+            }
+
+        with stage("io.read", path=self.path, out_shape=out_shape) as s:
+            data = self._dataset().read(1, masked=masked, **kwargs)
+            s.add_array("data", data)
+        return data
+
+    def _window_bounds(self, window) -> tuple[int, int, int, int]:
+        if len(window) == 3:
+            row, col, size = window
+            height, width = (size, size) if np.isscalar(size) else size
+        else:
+            row, col, height, width = window
+
+        H, W = self.shape
+        if not (
+            0 <= row and 0 <= col and height > 0 and width > 0
+            and row + height <= H and col + width <= W
+        ):
+            raise ValueError(
+                f"Window {(row, col, height, width)} is outside the "
+                f"{H}x{W} raster"
+            )
+        return int(row), int(col), int(height), int(width)
+
+    def _tiles_for(self, row, col, height, width):
+        th, tw = self.tile_shape
+        for ti in range(row // th, (row + height - 1) // th + 1):
+            for tj in range(col // tw, (col + width - 1) // tw + 1):
+                yield ti, tj
+
+    def _read_tile(self, key) -> np.ma.MaskedArray:
+        from rasterio.windows import Window
+
+        ti, tj = key
+        th, tw = self.tile_shape
+        H, W = self.shape
+        r0, c0 = ti * th, tj * tw
+        window = Window(c0, r0, min(tw, W - c0), min(th, H - r0))
+        return self._dataset().read(1, window=window, masked=True)
+
+    def _assemble(self, row, col, height, width, tiles, masked):
+        th, tw = self.tile_shape
+        out = np.empty((height, width), dtype=self._layout()["meta"]["dtype"])
+        mask = np.zeros((height, width), dtype=bool) if masked else None
+
+        for ti, tj in self._tiles_for(row, col, height, width):
+            tile = tiles[ti, tj]
+            r0, c0 = ti * th, tj * tw
+            top, left = max(row, r0), max(col, c0)
+            bottom = min(row + height, r0 + tile.shape[0])
+            right = min(col + width, c0 + tile.shape[1])
+
+            dst = (slice(top - row, bottom - row), slice(left - col, right - col))
+            src = (slice(top - r0, bottom - r0), slice(left - c0, right - c0))
+            out[dst] = tile.data[src]
+            if masked and tile.mask is not np.ma.nomask:
+                mask[dst] = tile.mask[src]
+
+        return np.ma.MaskedArray(out, mask=mask) if masked else out
+
+    def read_windows(
+        self,
+        windows,
+        masked: bool = True,
+        workers: int | None = None,
+    ) -> list[np.ndarray]:
+        """
+        Read many windows in one call.
+
+        Each window is ``(row, col, size)``, ``(row, col, (height,
+        width))`` or ``(row, col, height, width)`` and must lie inside
+        the raster. Every cache tile the windows touch is decoded once,
+        in file order, on up to ``workers`` threads (default: the
+        calling thread); decoded tiles go through the cache.
+
+        Returns
+        -------
+        list of np.ndarray
+            One array per window (masked arrays when ``masked``).
+        """
+        bounds = [self._window_bounds(w) for w in windows]
+
+        with stage("io.read_windows", path=self.path, n_windows=len(bounds)):
+            needed = sorted(
+                {key for b in bounds for key in self._tiles_for(*b)}
+            )
+
+            tiles, missing = {}, []
+            for key in needed:
+                tile = self.cache.get(key)
+                if tile is None:
+                    missing.append(key)
+                else:
+                    tiles[key] = tile
+
+            if workers in (None, 1) or len(missing) < 2:
+                decoded = map(self._read_tile, missing)
+            else:
+                pool = self._executor(workers)
+                decoded = list(pool.map(self._read_tile, missing))
+
+            for key, tile in zip(missing, decoded):
+                tiles[key] = tile
+                self.cache.put(key, tile)
+
+            return [self._assemble(*b, tiles, masked) for b in bounds]
 
     def read_window(
         self,
         row: int,
         col: int,
-        size: int,
+        size: int | tuple[int, int],
         masked: bool = True
     ) -> np.ndarray:
         """
-        Read a square window from raster.
+        Read a window from raster.
+
+        ``size`` is either a single side length (square window) or a
+        ``(height, width)`` pair.
         """
-        with rasterio.open(self.path) as src:
-            window = Window(col, row, size, size)
-            return src.read(1, window=window, masked=masked)
+        return self.read_windows([(row, col, size)], masked=masked)[0]
@@ -0,0 +1,321 @@
+"""
+Multi-resolution (pyramid) synthesis for previews and coarse runs.
+
+Level ``L`` runs a flood, roads or urban pipeline on the DEM decimated
+by ``2**L``. The DEM is read at the reduced shape (from the file's
+internal overviews when it has them, otherwise by average resampling)
+and every parameter measured in pixels is rescaled so the coarse result
+is statistically consistent with a full-resolution run:
+
+- ``spatial_scale`` is divided by the factor
+- ``constraints.resolution_factor`` is multiplied by it, which divides
+  the smoothing sigma while ``smoothness_kernel_size`` stays the
+  validated odd integer
+- for unnormalized Gaussian or spectral latents, whose smoothed
+  amplitude grows as the smoothing scale shrinks,
+  ``perturbation_strength`` is divided by the factor (normalized and
+  Perlin latents do not depend on it)
+
+Results come back at the coarse level, upsampled to the full shape, or
+refined: the coarse latent fields are upsampled and the constraint and
+calibration stages rerun on the full-resolution DEM, so terrain detail
+is exact while noise generation, the costly stage, stays coarse.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Callable
+
+import numpy as np
+
+from geo_augment.core.parallel import spawn_sample_seeds
+from geo_augment.core.precision import resolve_dtype
+from geo_augment.core.profiling import profiled
+
+
+MODES = ("coarse", "upsample", "refine")
+
+
+# -----------------------------
+# Level geometry
+# -----------------------------
+
+def level_factor(level: int) -> int:
+    if level < 0:
+        raise ValueError("level must be >= 0")
+    return 2 ** level
+
+
+def level_shape(shape: tuple[int, int], level: int) -> tuple[int, int]:
+    """
+    Raster shape at pyramid ``level`` (each side divided, rounded up).
+    """
+    factor = level_factor(level)
+    return tuple(-(-side // factor) for side in shape)
+
+
+def level_georef(georef: dict, shape: tuple[int, int]) -> dict:
+    """
+    Raster profile of the same footprint resampled to ``shape``.
+    """
+    georef = dict(georef)
+    sy = georef["height"] / shape[0]
+    sx = georef["width"] / shape[1]
+
+    t = georef.get("transform")
+    if t is not None:
+        georef["transform"] = type(t)(
+            t.a * sx, t.b * sy, t.c, t.d * sx, t.e * sy, t.f
+        )
+    georef["height"], georef["width"] = shape
+    return georef
+
+
+def rescale_specs(synthesis_spec, constraints, latent_spec, factor: float):
+    """
+    Specs for pixels ``factor`` times larger than the ones they were
+    written for. Works for the flood, roads and urban specs.
+    """
+    if factor == 1:
+        return synthesis_spec, constraints, latent_spec
+
+    changes = {"spatial_scale": synthesis_spec.spatial_scale / factor}
+    if latent_spec.noise_type != "perlin" and not latent_spec.normalize:
+        changes["perturbation_strength"] = (
+            synthesis_spec.perturbation_strength / factor
+        )
+
+    return (
+        replace(synthesis_spec, **changes),
+        replace(
+            constraints,
+            resolution_factor=constraints.resolution_factor * factor,
+        ),
+        latent_spec,
+    )
+
+
+def upsample(field: np.ndarray, shape: tuple[int, int], order: int = 1) -> np.ndarray:
+    """
+    Resample the trailing (h, w) axes of ``field`` to ``shape``.
+
+    Pixel areas are aligned (``grid_mode``), so a coarse pixel covers
+    exactly the fine pixels it was averaged from.
+    """
+    from scipy.ndimage import zoom
+
+    h, w = field.shape[-2:]
+    factors = (1,) * (field.ndim - 2) + (shape[0] / h, shape[1] / w)
+    return zoom(field, factors, order=order, mode="nearest", grid_mode=True)
+
+
+# -----------------------------
+# Domain adapters
+# -----------------------------
+
+@dataclass(frozen=True)
+class _Domain:
+    # (dem, synthesis_spec, constraints, latent_spec, n, workers, dtype)
+    synthesize: Callable
+    # (synthesis_spec, constraints, latent_spec)
+    validate: Callable
+    # (shape, synthesis_spec, latent_spec, seeds, dtype) -> (N, h, w)
+    latent: Callable
+    # (latent, dem, synthesis_spec, constraints, dtype) -> (N, H, W)
+    finish: Callable
+
+
+def _floods() -> _Domain:
+    from geo_augment.domains.floods.api import synthesize_flood_risk
+    from geo_augment.domains.floods.calibration import calibrate_flood_risk
+    from geo_augment.domains.floods.constraints import apply_flood_constraints
+    from geo_augment.domains.floods.latent import generate_latent_flood_fields
+    from geo_augment.domains.floods.validation import validate_all_flood_specs
+
+    def synthesize(dem, spec, constraints, latent_spec, n, workers, dtype):
+        return synthesize_flood_risk(
+            dem, spec, constraints, latent_spec,
+            n_samples=n, workers=workers, dtype=dtype,
+        )
+
+    def latent(shape, spec, latent_spec, seeds, dtype):
+        return generate_latent_flood_fields(
+            shape=shape,
+            perturbation_strength=spec.perturbation_strength,
+            spatial_scale=spec.spatial_scale,
+            seeds=seeds,
+            latent_spec=latent_spec,
+            dtype=dtype,
+        )
+
+    def finish(latent, dem, spec, constraints, dtype):
+        constrained = apply_flood_constraints(latent, dem, constraints)
+        risk = calibrate_flood_risk(
+            constrained, spec.risk_percentile, spec.value_range
+        )
+        return risk.astype(dtype, copy=False)
+
+    def validate(spec, constraints, latent_spec):
+        validate_all_flood_specs(
+            synthesis=spec, constraints=constraints, latent=latent_spec
+        )
+
+    return _Domain(synthesize, validate, latent, finish)
+
+
+def _roads() -> _Domain:
+    from geo_augment.domains.roads.api import synthesize_road_connectivity
+    from geo_augment.domains.roads.calibration import calibrate_road_connectivity
+    from geo_augment.domains.roads.constraints import apply_road_constraints
+    from geo_augment.domains.roads.features import stack_road_features
+    from geo_augment.domains.roads.latent import generate_latent_road_field
+    from geo_augment.domains.roads.validation import validate_road_specs
+
+    def synthesize(dem, spec, constraints, latent_spec, n, workers, dtype):
+        return synthesize_road_connectivity(
+            dem, spec, constraints, latent_spec,
+            n_samples=n, workers=workers, dtype=dtype,
+        )
+
+    def latent(shape, spec, latent_spec, seeds, dtype):
+        return np.stack([
+            generate_latent_road_field(
+                shape, spec.perturbation_strength, spec.spatial_scale,
+                seed, latent_spec, dtype=dtype,
+            )
+            for seed in seeds
+        ])
+
+    def finish(latent, dem, spec, constraints, dtype):
+        features = stack_road_features(dem, dtype=dtype)
+        return np.stack([
+            calibrate_road_connectivity(
+                apply_road_constraints(field, features, constraints),
+                spec.connectivity_percentile,
+                spec.value_range,
+            )
+            for field in latent
+        ]).astype(dtype, copy=False)
+
+    return _Domain(synthesize, validate_road_specs, latent, finish)
+
+
+def _urban() -> _Domain:
+    from geo_augment.domains.urban.api import synthesize_urban_morphology
+    from geo_augment.domains.urban.calibration import calibrate_urban_density
+    from geo_augment.domains.urban.constraints import apply_urban_constraints
+    from geo_augment.domains.urban.features import stack_urban_features
+    from geo_augment.domains.urban.latent import generate_latent_urban_field
+    from geo_augment.domains.urban.validation import validate_urban_specs
+
+    def synthesize(dem, spec, constraints, latent_spec, n, workers, dtype):
+        return synthesize_urban_morphology(
+            dem, spec, constraints, latent_spec,
+            n_samples=n, workers=workers, dtype=dtype,
+        )
+
+    def latent(shape, spec, latent_spec, seeds, dtype):
+        return np.stack([
+            generate_latent_urban_field(
+                shape, spec.perturbation_strength, spec.spatial_scale,
+                seed, latent_spec, dtype=dtype,
+            )
+            for seed in seeds
+        ])
+
+    def finish(latent, dem, spec, constraints, dtype):
+        features = stack_urban_features(dem, dtype=dtype)
+        return np.stack([
+            calibrate_urban_density(
+                apply_urban_constraints(field, features, constraints),
+                spec.density_percentile,
+                spec.value_range,
+            )
+            for field in latent
+        ]).astype(dtype, copy=False)
+
+    return _Domain(synthesize, validate_urban_specs, latent, finish)
+
+
+DOMAINS = {"floods": _floods, "roads": _roads, "urban": _urban}
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+@profiled("pyramid.synthesis")
+def synthesize_pyramid(
+    domain: str,
+    loader,
+    synthesis_spec,
+    constraints,
+    latent_spec,
+    level: int = 1,
+    n_samples: int = 1,
+    mode: str = "coarse",
+    workers: int | None = None,
+    dtype=None,
+) -> np.ndarray:
+    """
+    Run a domain pipeline at pyramid ``level`` of a DEM.
+
+    Parameters
+    ----------
+    domain : str
+        'floods' | 'roads' | 'urban'
+    loader : RasterLoader
+        Source DEM; only read at full resolution for ``mode='refine'``.
+    synthesis_spec, constraints, latent_spec
+        Full-resolution specs of the domain; rescaled internally.
+    level : int
+        Decimation level (factor ``2**level``; 0 = full resolution).
+    mode : str
+        'coarse' returns (N, h, w) at the level; 'upsample' resamples
+        it to the full shape; 'refine' upsamples the coarse latent
+        fields and reruns constraints and calibration at full
+        resolution.
+
+    Returns
+    -------
+    np.ndarray
+        (N, h, w) for 'coarse', (N, H, W) otherwise.
+    """
+    if domain not in DOMAINS:
+        raise ValueError(f"Unknown domain '{domain}' (expected {list(DOMAINS)})")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}' (expected {list(MODES)})")
+    if n_samples <= 0:
+        raise ValueError("n_samples must be >= 1")
+
+    adapter = DOMAINS[domain]()
+    dtype = resolve_dtype(dtype)
+
+    coarse_specs = rescale_specs(
+        synthesis_spec, constraints, latent_spec, level_factor(level)
+    )
+    full_shape = loader.shape
+    dem = loader.read(out_shape=level_shape(full_shape, level))
+
+    if mode == "refine":
+        adapter.validate(*coarse_specs)
+        adapter.validate(synthesis_spec, constraints, latent_spec)
+
+        coarse_spec, _, coarse_latent_spec = coarse_specs
+        seeds = spawn_sample_seeds(synthesis_spec.random_seed, n_samples)
+        latent = adapter.latent(
+            dem.shape, coarse_spec, coarse_latent_spec, seeds, dtype
+        )
+        return adapter.finish(
+            upsample(latent, full_shape),
+            loader.read(),
+            synthesis_spec,
+            constraints,
+            dtype,
+        )
+
+    result = adapter.synthesize(dem, *coarse_specs, n_samples, workers, dtype)
+
+    if mode == "upsample":
+        result = upsample(result, full_shape)
+
+    return result
@@ -30,6 +30,9 @@ setup(
         "scikit-learn",
         "pyyaml",
     ],
+    extras_require={
+        "jit": ["numba"],
+    },
     entry_points={
         "console_scripts": [
             "geoaugment=geo_augment.cli.main:main"